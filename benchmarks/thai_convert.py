@@ -0,0 +1,87 @@
+"""QWERTY -> Thai conversion throughput: translate tables vs the original per-character loop.
+
+    python benchmarks/thai_convert.py [--seconds 1]
+
+Texts are built by repeating the mistyped lines of the message corpus up to
+each target size, so the character mix matches real input.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.thai_layout import qwerty_to_thai_text, thai_to_qwerty_text  # noqa: E402
+
+CORPUS = os.path.join(ROOT, "benchmarks", "data", "discord_messages.tsv")
+SIZES: tuple[int, ...] = (64, 1_024, 16_384, 262_144, 1_048_576)
+
+# The unshifted-only map the bot used before the Kedmanee tables (values were partly wrong)
+LEGACY_MAP: dict[str, str] = {
+    'q': 'ๆ', 'w': 'ไ', 'e': 'ำ', 'r': 'พ', 't': 'ะ', 'y': 'า', 'u': 'ส', 'i': 'ด', 'o': 'ฟ', 'p': 'ก', '[': 'ฮ', ']': 'ฺ',
+    'a': 'ฤ', 's': 'ฆ', 'd': 'ฏ', 'f': 'โ', 'g': 'ฌ', 'h': '็', 'j': '๋', 'k': 'ษ', 'l': 'ศ', ';': 'ซ', "'": 'ฅ',
+    'z': 'ผ', 'x': 'ป', 'c': 'ฉ', 'v': 'ฮ', 'b': 'ิ', 'n': 'ื', 'm': 'ท', ',': 'ม', '.': 'ใ', '/': 'ฝ',
+    '1': '๑', '2': '๒', '3': '๓', '4': '๔', '5': '๕', '6': '๖', '7': '๗', '8': '๘', '9': '๙', '0': '๐'
+}
+
+
+def legacy_qwerty_to_thai_text(text: str) -> str:
+    result_chars = []
+    for char in text:
+        lower = char.lower()
+        if lower in LEGACY_MAP:
+            result_chars.append(LEGACY_MAP[lower])
+        else:
+            result_chars.append(char)
+    return ''.join(result_chars)
+
+
+def sample_text(size: int) -> str:
+    lines = []
+    with open(CORPUS, "r", encoding="utf-8") as f:
+        for line in f:
+            label, _, text = line.rstrip("\n").partition("\t")
+            if label == "mistyped":
+                lines.append(text)
+    block = " ".join(lines)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def throughput(fn: Callable[[str], str], text: str, seconds: float) -> float:
+    """Characters converted per second."""
+    runs = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        fn(text)
+        runs += 1
+        if time.perf_counter() >= deadline:
+            break
+    return runs * len(text) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    converters = [
+        ("legacy loop", legacy_qwerty_to_thai_text),
+        ("translate", qwerty_to_thai_text),
+        ("reverse", thai_to_qwerty_text),
+    ]
+    print(f"{'chars':>10} " + " ".join(f"{name:>14}" for name, _ in converters) + "   (Mchars/sec)")
+    for size in SIZES:
+        text = sample_text(size)
+        thai = qwerty_to_thai_text(text)
+        rates = []
+        for name, fn in converters:
+            rates.append(throughput(fn, thai if name == "reverse" else text, args.seconds))
+        print(f"{size:>10,} " + " ".join(f"{rate / 1e6:>14.2f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
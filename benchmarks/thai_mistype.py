@@ -0,0 +1,111 @@
+"""Throughput and accuracy of the Thai mistype detector against the original heuristic.
+
+    python benchmarks/thai_mistype.py [--seconds 2] [--corpus benchmarks/data/discord_messages.tsv]
+
+The corpus is ``label<TAB>message``; ``mistyped`` lines are Thai typed with
+the US layout active and every other label is normal chat, so a hit on
+those counts as a false positive.
+
+``current`` is the fast ratio check (``mappable_ratio_check``), which must
+make the same decisions as ``legacy``; ``full`` is the whole detector
+including the markup filter and the n-gram model, shown for reference.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.thai_layout import DETECTION_KEYS, is_likely_mistyped_thai, mappable_ratio_check  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "data", "discord_messages.tsv")
+
+
+def legacy_is_likely_mistyped_thai(text: str) -> bool:
+    """The detector as it was in cogs/work.py before the fast path."""
+    if not text or len(text.strip()) < 2:
+        return False
+
+    if re.search('[\u0E00-\u0E7F]', text):
+        return False
+
+    mappable = sum(1 for c in text if c in DETECTION_KEYS)
+    total = sum(1 for c in text if c.isalnum() or c in "[]{};:'\",.<>/?`~!@#$%^&*()-_=+")
+    if total == 0:
+        return False
+
+    ratio = mappable / total
+    words = [w for w in re.split(r'\s+', text.strip()) if w]
+
+    if ratio >= 0.55 and len(words) > 1:
+        return True
+    if ratio >= 0.70 and len(text) >= 4:
+        return True
+
+    return False
+
+
+def load_corpus(path: str) -> list[tuple[str, str]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, _, text = line.partition("\t")
+            rows.append((label, text))
+    return rows
+
+
+def throughput(fn: Callable[[str], bool], messages: list[str], seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for text in messages:
+            fn(text)
+        count += len(messages)
+    return count / (time.perf_counter() - start)
+
+
+def accuracy(fn: Callable[[str], bool], rows: list[tuple[str, str]]) -> tuple[float, float]:
+    mistyped = [text for label, text in rows if label == "mistyped"]
+    normal = [text for label, text in rows if label != "mistyped"]
+    recall = sum(map(fn, mistyped)) / max(len(mistyped), 1)
+    false_positive = sum(map(fn, normal)) / max(len(normal), 1)
+    return recall, false_positive
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rows = load_corpus(args.corpus)
+    messages = [text for _, text in rows]
+    detectors = [
+        ("legacy", legacy_is_likely_mistyped_thai),
+        ("current", mappable_ratio_check),
+        ("full", is_likely_mistyped_thai),
+    ]
+
+    print(f"{len(rows)} messages ({sum(1 for label, _ in rows if label == 'mistyped')} mistyped)")
+    print(f"{'detector':<10} {'msgs/sec':>12} {'recall':>8} {'false pos':>10}")
+    for name, fn in detectors:
+        rate = throughput(fn, messages, args.seconds)
+        recall, false_positive = accuracy(fn, rows)
+        print(f"{name:<10} {rate:>12,.0f} {recall:>8.1%} {false_positive:>10.1%}")
+
+    disagree = [text for text in messages if legacy_is_likely_mistyped_thai(text) != mappable_ratio_check(text)]
+    print(f"ratio check decisions differing from legacy: {len(disagree)}")
+    for text in disagree[:10]:
+        print(f"  {text!r}")
+
+
+if __name__ == "__main__":
+    main()
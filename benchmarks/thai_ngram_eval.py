@@ -0,0 +1,94 @@
+"""Offline evaluation of the Thai autocorrect decision: ratio heuristic vs n-gram model.
+
+    python benchmarks/thai_ngram_eval.py [--corpus benchmarks/data/discord_messages.tsv] [--errors]
+
+Positives are the ``mistyped`` lines; the model is trained on ``models/corpus``
+only, so this corpus is held out. Run ``python -m utils.ngram_model build``
+first if ``models/lang_ngram.bin`` is missing.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.ngram_model import load_model  # noqa: E402
+from utils.thai_layout import QWERTY_TO_THAI, is_likely_mistyped_thai, mappable_ratio_check  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "data", "discord_messages.tsv")
+
+
+def load_corpus(path: str) -> list[tuple[bool, str]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, _, text = line.partition("\t")
+            rows.append((label == "mistyped", text))
+    return rows
+
+
+def evaluate(fn: Callable[[str], bool], rows: list[tuple[bool, str]]) -> dict[str, float]:
+    tp = fp = fn_ = 0
+    start = time.perf_counter()
+    for positive, text in rows:
+        hit = fn(text)
+        if hit and positive:
+            tp += 1
+        elif hit:
+            fp += 1
+        elif positive:
+            fn_ += 1
+    elapsed = time.perf_counter() - start
+    negatives = sum(1 for positive, _ in rows if not positive)
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 0.0,
+        "recall": tp / (tp + fn_) if tp + fn_ else 0.0,
+        "false_positive_rate": fp / negatives if negatives else 0.0,
+        "us_per_message": elapsed / len(rows) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--errors", action="store_true", help="list the messages the combined detector gets wrong")
+    args = parser.parse_args()
+
+    model = load_model()
+    if model is None:
+        sys.exit("no n-gram model; run `python -m utils.ngram_model build` first")
+
+    rows = load_corpus(args.corpus)
+
+    def model_only(text: str) -> bool:
+        return model.is_mistyped(text, text.translate(QWERTY_TO_THAI))
+
+    detectors = [
+        ("ratio heuristic", mappable_ratio_check),
+        ("n-gram only", model_only),
+        ("ratio + n-gram", is_likely_mistyped_thai),
+    ]
+    print(f"{len(rows)} messages, {sum(p for p, _ in rows)} mistyped; model threshold {model.threshold:.3f}")
+    print(f"{'detector':<16} {'precision':>9} {'recall':>7} {'FP rate':>8} {'us/msg':>7}")
+    for name, fn in detectors:
+        # One warm-up pass so the first mmap page faults are not timed
+        evaluate(fn, rows)
+        r = evaluate(fn, rows)
+        print(f"{name:<16} {r['precision']:>9.1%} {r['recall']:>7.1%} {r['false_positive_rate']:>8.1%} {r['us_per_message']:>7.1f}")
+
+    if args.errors:
+        for positive, text in rows:
+            if is_likely_mistyped_thai(text) != positive:
+                kind = "missed" if positive else "false positive"
+                margin = model.thai_margin(text, text.translate(QWERTY_TO_THAI))
+                print(f"  {kind:<14} {margin:+.3f} {text!r}")
+
+
+if __name__ == "__main__":
+    main()
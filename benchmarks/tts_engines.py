@@ -0,0 +1,94 @@
+"""Synthesis latency and CPU cost per character for each TTS engine and language.
+
+    python benchmarks/tts_engines.py [--engines gtts,espeak,piper] [--repeat 3] [--encode]
+
+Engines that are not installed (or, for piper, have no model for a language)
+are skipped. CPU time counts this process plus its finished children, so it
+covers subprocess engines as well; for gTTS most of the cost is the network
+round trip, which shows up as latency rather than CPU. ``--encode`` adds the
+Ogg Opus transcode the bot does before caching.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.tts_engines import ENGINES, LANGUAGES, TTSEngine  # noqa: E402
+from utils.tts_synth import encode_opus  # noqa: E402
+
+SAMPLES: dict[str, tuple[str, ...]] = {
+    "th": ("สวัสดีครับ", "วันนี้อากาศดีมาก ไปกินข้าวกันไหม", "เดี๋ยวเข้าเกมแล้วนะ รอแป๊บหนึ่ง"),
+    "en": ("hello", "is anyone up for a match tonight", "brb grabbing food, start without me"),
+    "ko": ("안녕하세요", "오늘 저녁에 같이 게임할 사람 있어요", "잠깐만 기다려 주세요"),
+    "ja": ("こんにちは", "今夜一緒にゲームする人いますか", "ちょっと待ってください"),
+}
+
+
+def cpu_seconds() -> float:
+    total = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += children.ru_utime + children.ru_stime
+    return total
+
+
+def measure(engine: TTSEngine, lang: str, repeat: int, encode: bool) -> dict[str, float]:
+    latencies = []
+    cpu = 0.0
+    chars = 0
+    for _ in range(repeat):
+        for text in SAMPLES[lang]:
+            cpu_start = cpu_seconds()
+            start = time.perf_counter()
+            audio = engine.synthesize(text, lang)
+            if encode:
+                encode_opus(audio)
+            latencies.append(time.perf_counter() - start)
+            cpu += cpu_seconds() - cpu_start
+            chars += len(text)
+    latencies.sort()
+    return {
+        "median_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "cpu_ms_per_char": cpu / chars * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--encode", action="store_true", help="include the Ogg Opus transcode")
+    args = parser.parse_args()
+
+    print(f"{'engine':<8} {'lang':<5} {'median ms':>10} {'p95 ms':>8} {'CPU ms/char':>12}")
+    for name in args.engines.split(","):
+        engine = ENGINES[name.strip()]()
+        if not engine.available():
+            print(f"{engine.name:<8} (not installed)")
+            continue
+        for lang in LANGUAGES:
+            if not engine.supports(lang):
+                print(f"{engine.name:<8} {lang:<5} (no voice)")
+                continue
+            # Warm-up: first call pays for imports, DNS/TLS or model loading
+            engine.synthesize(SAMPLES[lang][0], lang)
+            try:
+                r = measure(engine, lang, args.repeat, args.encode)
+            except Exception as e:
+                print(f"{engine.name:<8} {lang:<5} failed: {e}")
+                continue
+            print(f"{engine.name:<8} {lang:<5} {r['median_ms']:>10.1f} {r['p95_ms']:>8.1f} {r['cpu_ms_per_char']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Time from "utterance ready" to the first 20 ms frame being available to the voice thread.
+
+    python benchmarks/tts_time_to_audio.py [--runs 20]
+
+Compares the old per-message path (spawn FFmpeg on the audio, as
+``FFmpegPCMAudio(pipe=True)`` does, and wait for the first PCM frame) with
+feeding cached Opus packets into a ``GuildAudioStream``. The stream is read by
+a stand-in for discord.py's ``AudioPlayer`` thread (one ``read()`` per 20 ms,
+parked on an event while paused), in three situations:
+
+- ``stream, busy``: the player is running, e.g. right after another message;
+- ``after pause, resume``: the channel went quiet, the player was paused and
+  the next message resumes it (the current behaviour);
+- ``after pause, new play``: a new stream and player thread per quiet spell
+  (what happened when the stream ended after lingering).
+
+Only the local part is measured; both pause paths also send one speaking
+update over the voice websocket before Discord relays audio.
+"""
+import argparse
+import io
+import math
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.voice_stream import SILENCE, GuildAudioStream  # noqa: E402
+
+FRAME_BYTES = 3840  # 20 ms of 48 kHz stereo s16le
+FRAME_SECONDS = 0.02
+FFMPEG_PCM = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ar", "48000", "-ac", "2", "pipe:1"]
+
+
+class Player(threading.Thread):
+    """The parts of discord.py's AudioPlayer that affect latency: paced reads, pause and resume."""
+
+    def __init__(self, source: GuildAudioStream, first_packet: threading.Event) -> None:
+        super().__init__(daemon=True)
+        self.source = source
+        self.first_packet = first_packet
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self.ended = threading.Event()
+        self.loops = 0
+        self.start_time = 0.0
+
+    def run(self) -> None:
+        self.start_time = time.perf_counter()
+        while not self.ended.is_set():
+            if not self.resumed.is_set():
+                self.resumed.wait()
+                continue
+            if self.source.read() != SILENCE:
+                self.first_packet.set()
+            self.loops += 1
+            time.sleep(max(0.0, self.start_time + FRAME_SECONDS * self.loops - time.perf_counter()))
+
+    def pause(self) -> None:
+        self.resumed.clear()
+
+    def resume(self) -> None:
+        self.loops = 0
+        self.start_time = time.perf_counter()
+        self.resumed.set()
+
+    def stop(self) -> None:
+        self.ended.set()
+        self.resumed.set()
+        self.join()
+
+
+def sample_wav(seconds: float = 1.5, rate: int = 24000) -> bytes:
+    """A mono tone roughly the size of a short gTTS clip."""
+    frames = b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / rate))) for i in range(int(seconds * rate)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def ffmpeg_first_frame(audio: bytes) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(FFMPEG_PCM, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    writer = threading.Thread(target=lambda: (proc.stdin.write(audio), proc.stdin.close()))
+    writer.start()
+    proc.stdout.read(FRAME_BYTES)
+    elapsed = time.perf_counter() - start
+    proc.kill()
+    proc.wait()
+    writer.join()
+    return elapsed
+
+
+def busy_first_frame(packets: tuple[bytes, ...], runs: int) -> list[float]:
+    first_packet = threading.Event()
+    stream = GuildAudioStream(linger_frames=10 ** 9)
+    player = Player(stream, first_packet)
+    player.start()
+    times = []
+    for _ in range(runs):
+        first_packet.clear()
+        start = time.perf_counter()
+        stream.feed(packets, lambda: None)
+        first_packet.wait()
+        times.append(time.perf_counter() - start)
+        stream.skip()
+    player.stop()
+    return times
+
+
+def resume_first_frame(packets: tuple[bytes, ...], runs: int) -> list[float]:
+    first_packet = threading.Event()
+    stream = GuildAudioStream(linger_frames=10 ** 9)
+    player = Player(stream, first_packet)
+    player.start()
+    times = []
+    for _ in range(runs):
+        player.pause()
+        time.sleep(3 * FRAME_SECONDS)
+        first_packet.clear()
+        start = time.perf_counter()
+        stream.feed(packets, lambda: None)
+        player.resume()
+        first_packet.wait()
+        times.append(time.perf_counter() - start)
+        stream.skip()
+    player.stop()
+    return times
+
+
+def new_play_first_frame(packets: tuple[bytes, ...], runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        first_packet = threading.Event()
+        start = time.perf_counter()
+        stream = GuildAudioStream(linger_frames=10 ** 9)
+        stream.feed(packets, lambda: None)
+        player = Player(stream, first_packet)
+        player.start()
+        first_packet.wait()
+        times.append(time.perf_counter() - start)
+        player.stop()
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    audio = sample_wav()
+    packets = tuple(bytes(120) for _ in range(75))
+
+    results = {}
+    try:
+        ffmpeg_first_frame(audio)
+        results["ffmpeg per message"] = [ffmpeg_first_frame(audio) for _ in range(args.runs)]
+    except FileNotFoundError:
+        print("ffmpeg not found; skipping the per-message FFmpeg path")
+    results["stream, busy"] = busy_first_frame(packets, args.runs)
+    results["after pause, resume"] = resume_first_frame(packets, args.runs)
+    results["after pause, new play"] = new_play_first_frame(packets, args.runs)
+
+    print(f"{'path':<22} {'median ms':>10} {'max ms':>8}")
+    for name, times in results.items():
+        print(f"{name:<22} {statistics.median(times) * 1000:>10.2f} {max(times) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from discord.ext import commands
 import google.genai as genai
 from google.genai import types
 
+from utils.metrics import AI_REQUEST_DURATION, STORAGE_FLUSH_DURATION
+
 GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 AIMODEL: str = "gemini-2.5-flash"
 CONFIG_FILE: str = "./config/ai_channel_config.json"
@@ -33,7 +35,7 @@ def load_config() -> dict[str, Any]:
 
 
 def save_config(data: dict[str, Any]) -> None:
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+    with STORAGE_FLUSH_DURATION.time(store="ai_channel_config"), open(CONFIG_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
@@ -55,18 +57,18 @@ class AI(commands.Cog):
             print("⚠️ Warning: GEMINI_API_KEY is missing in cogs/ai.py")
             self.client = None
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author == self.bot.user:
-            return
+    async def cog_load(self):
+        self.route_channels(load_config())
 
-        # ตรวจสอบว่าเป็นคำสั่ง Prefix หรือไม่ (ถ้าใช่ ให้ข้ามไป เพื่อไม่ให้ AI ตอบทับซ้อนกับคำสั่ง)
-        # หมายเหตุ: ใน listener ของ Cog เราไม่ต้องเรียก process_commands
-        ctx = await self.bot.get_context(message)
-        if ctx.valid:
-            return
+    def cog_unload(self):
+        self.bot.router.remove("ai")
 
-        # ฟีเจอร์ Talking Channel
+    def route_channels(self, config: dict[str, Any]) -> None:
+        # Router only calls handle_message for channels set up with aisetup
+        self.bot.router.set_channels("ai", config.get("channels", {}).keys(), self.handle_message)
+
+    async def handle_message(self, message: discord.Message, ctx: commands.Context):
+        # ฟีเจอร์ Talking Channel (router ข้ามข้อความที่เป็นคำสั่ง Prefix ให้แล้ว)
         config = load_config()
         channel_id = str(message.channel.id)
         
@@ -82,11 +84,12 @@ class AI(commands.Cog):
                     channel_config = config["channels"][channel_id]
                     system_prompt = channel_config.get("prompt", INSTRUCTIONS_EN)
                     
-                    response = self.client.models.generate_content(
-                        model=AIMODEL,
-                        contents=message.content,
-                        config={"system_instruction": system_prompt}
-                    )
+                    with AI_REQUEST_DURATION.time(kind="channel"):
+                        response = self.client.models.generate_content(
+                            model=AIMODEL,
+                            contents=message.content,
+                            config={"system_instruction": system_prompt}
+                        )
                     response_text: str = response.text or ""
                     
                     if len(response_text) > 2000:
@@ -129,6 +132,7 @@ class AI(commands.Cog):
         }
         
         save_config(config)
+        self.route_channels(config)
         
         await ctx.send(
             f"✅ ตั้งค่าห้องแชทเรียบร้อย! บอทจะคุยในห้อง <#{target_channel_id}>\n{prompt_status}"
@@ -178,6 +182,7 @@ class AI(commands.Cog):
         
         del config["channels"][target_channel_id]
         save_config(config)
+        self.route_channels(config)
         
         await ctx.send(f"✅ ลบการตั้งค่าห้องนี้เรียบร้อยแล้ว")
 
@@ -212,11 +217,12 @@ class AI(commands.Cog):
             try:
                 final_prompt = get_instruction_by_language(language)
                 
-                response = self.client.models.generate_content(
-                    model=model_name,
-                    contents=question,
-                    config={"system_instruction": final_prompt}
-                )
+                with AI_REQUEST_DURATION.time(kind="ask"):
+                    response = self.client.models.generate_content(
+                        model=model_name,
+                        contents=question,
+                        config={"system_instruction": final_prompt}
+                    )
                 response_text: str = response.text or ""
 
                 header = f"**Q:** {question}\n"
@@ -267,6 +273,7 @@ class AI(commands.Cog):
         }
         
         save_config(config)
+        self.route_channels(config)
         
         await interaction.response.send_message(
             f"✅ ตั้งค่าห้องแชทเรียบร้อย! บอทจะคุยในห้อง <#{target_channel_id}>\n{prompt_status}"
@@ -314,6 +321,7 @@ class AI(commands.Cog):
         
         del config["channels"][target_channel_id]
         save_config(config)
+        self.route_channels(config)
         
         await interaction.response.send_message(f"✅ ลบการตั้งค่าห้องนี้เรียบร้อยแล้ว")
         
@@ -347,11 +355,12 @@ class AI(commands.Cog):
                 final_prompt = get_instruction_by_language(language)
             
             # Build config without external tool integrations
-            response = self.client.models.generate_content(
-                model=model,
-                contents=[types.Content(role="user", parts=[types.Part(text=question)])],
-                config=types.GenerateContentConfig(system_instruction=final_prompt)
-            )
+            with AI_REQUEST_DURATION.time(kind="ask"):
+                response = self.client.models.generate_content(
+                    model=model,
+                    contents=[types.Content(role="user", parts=[types.Part(text=question)])],
+                    config=types.GenerateContentConfig(system_instruction=final_prompt)
+                )
 
             response_text = response.text if response.text else "No response generated."
             header = f"**Q:** {question}\n"
@@ -7,6 +7,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.metrics import STORAGE_FLUSH_DURATION
+from utils.purge_engine import PurgeJob
+
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 CHANNELS_FILE = DATA_DIR / "channels.json"
@@ -22,7 +25,7 @@ def _load_data() -> dict:
 
 def _save_data(data: dict) -> None:
     DATA_DIR.mkdir(exist_ok=True)
-    with open(CHANNELS_FILE, "w", encoding="utf-8") as f:
+    with STORAGE_FLUSH_DURATION.time(store="channels"), open(CHANNELS_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
 
 
@@ -35,7 +38,7 @@ def _load_server_config() -> dict:
 
 def _save_server_config(config: dict) -> None:
     DATA_DIR.mkdir(exist_ok=True)
-    with open(SERVERS_FILE, "w", encoding="utf-8") as f:
+    with STORAGE_FLUSH_DURATION.time(store="servers"), open(SERVERS_FILE, "w", encoding="utf-8") as f:
         json.dump(config, f, indent=2)
 
 
@@ -85,6 +88,41 @@ def build_dashboard_embed(
     return embed
 
 
+def _is_dashboard(message: discord.Message, bot_user) -> bool:
+    return message.author == bot_user and bool(message.embeds) and message.embeds[0].title == DASHBOARD_TITLE
+
+
+def _remember_dashboard(channel_id: int, message_id: int) -> None:
+    data = _load_data()
+    info = data.get(str(channel_id))
+    if info is not None and info.get("dashboard_message_id") != message_id:
+        info["dashboard_message_id"] = message_id
+        _save_data(data)
+
+
+async def _update_dashboard(
+    interaction: discord.Interaction,
+    owner: discord.Member | discord.User,
+    data: dict,
+) -> None:
+    """Re-render the channel's dashboard from a modal, where ``interaction.message`` may not be it."""
+    channel = interaction.channel
+    embed = build_dashboard_embed(channel, owner, data)
+    message_id = _channel_info(channel.id, data).get("dashboard_message_id")
+    if message_id:
+        try:
+            await channel.get_partial_message(message_id).edit(embed=embed)
+            return
+        except discord.NotFound:
+            pass
+    # Channels created before the id was stored (or whose dashboard was deleted): find it once
+    for msg in await channel.pins():
+        if _is_dashboard(msg, interaction.client.user):
+            await msg.edit(embed=embed)
+            _remember_dashboard(channel.id, msg.id)
+            return
+
+
 class CreateChannelView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
@@ -122,6 +160,8 @@ class DashboardView(discord.ui.View):
         owner = guild.get_member(info.get("owner_id", 0)) or interaction.user
         embed = build_dashboard_embed(interaction.channel, owner, data)
         await interaction.message.edit(embed=embed, view=self)
+        if info.get("dashboard_message_id") != interaction.message.id:
+            _remember_dashboard(interaction.channel_id, interaction.message.id)
 
     @discord.ui.button(label="✏️ เปลี่ยนชื่อ", style=discord.ButtonStyle.primary, custom_id="dash:rename", row=0)
     async def rename_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -269,12 +309,7 @@ class RenameModal(discord.ui.Modal, title="เปลี่ยนชื่อช
         data = _load_data()
         info = data.get(str(interaction.channel_id), {})
         owner = interaction.guild.get_member(info.get("owner_id", 0)) or interaction.user
-        embed = build_dashboard_embed(interaction.channel, owner, data)
-        pins = await interaction.channel.pins()
-        for msg in pins:
-            if msg.author == interaction.client.user and msg.embeds and msg.embeds[0].title == DASHBOARD_TITLE:
-                await msg.edit(embed=embed)
-                break
+        await _update_dashboard(interaction, owner, data)
 
 
 class TopicModal(discord.ui.Modal, title="ตั้งหัวข้อช่อง"):
@@ -294,12 +329,7 @@ class TopicModal(discord.ui.Modal, title="ตั้งหัวข้อช่
         data = _load_data()
         info = data.get(str(interaction.channel_id), {})
         owner = interaction.guild.get_member(info.get("owner_id", 0)) or interaction.user
-        embed = build_dashboard_embed(interaction.channel, owner, data)
-        pins = await interaction.channel.pins()
-        for msg in pins:
-            if msg.author == interaction.client.user and msg.embeds and msg.embeds[0].title == DASHBOARD_TITLE:
-                await msg.edit(embed=embed)
-                break
+        await _update_dashboard(interaction, owner, data)
 
 
 class AddMemberModal(discord.ui.Modal, title="เพิ่มสมาชิก"):
@@ -331,12 +361,7 @@ class AddMemberModal(discord.ui.Modal, title="เพิ่มสมาชิก"
         data = _load_data()
         info = data.get(str(interaction.channel_id), {})
         owner = interaction.guild.get_member(info.get("owner_id", 0)) or interaction.user
-        embed = build_dashboard_embed(interaction.channel, owner, data)
-        pins = await interaction.channel.pins()
-        for msg in pins:
-            if msg.author == interaction.client.user and msg.embeds and msg.embeds[0].title == DASHBOARD_TITLE:
-                await msg.edit(embed=embed)
-                break
+        await _update_dashboard(interaction, owner, data)
 
 
 class RemoveMemberModal(discord.ui.Modal, title="ลบสมาชิก"):
@@ -367,12 +392,7 @@ class RemoveMemberModal(discord.ui.Modal, title="ลบสมาชิก"):
             f"✅ ลบ {member.mention} ออกจากช่องแล้ว", ephemeral=True
         )
         owner = interaction.guild.get_member(info.get("owner_id", 0)) or interaction.user
-        embed = build_dashboard_embed(interaction.channel, owner, data)
-        pins = await interaction.channel.pins()
-        for msg in pins:
-            if msg.author == interaction.client.user and msg.embeds and msg.embeds[0].title == DASHBOARD_TITLE:
-                await msg.edit(embed=embed)
-                break
+        await _update_dashboard(interaction, owner, data)
 
 
 class TransferOwnerModal(discord.ui.Modal, title="โอนความเป็นเจ้าของ"):
@@ -410,12 +430,45 @@ class TransferOwnerModal(discord.ui.Modal, title="โอนความเป็
         await interaction.response.send_message(
             f"✅ โอนความเป็นเจ้าของให้ {member.mention} แล้ว", ephemeral=True
         )
-        embed = build_dashboard_embed(interaction.channel, member, data)
-        pins = await interaction.channel.pins()
-        for msg in pins:
-            if msg.author == interaction.client.user and msg.embeds and msg.embeds[0].title == DASHBOARD_TITLE:
-                await msg.edit(embed=embed)
-                break
+        await _update_dashboard(interaction, member, data)
+
+
+# Channel id -> running purge, so a second submit cannot start a parallel one
+ACTIVE_PURGES: dict[int, PurgeJob] = {}
+# Interaction tokens (and so the ephemeral followup) expire after 15 minutes
+FOLLOWUP_LIFETIME: float = 14 * 60
+
+
+def _purge_status(job: PurgeJob) -> str:
+    if not job.finished:
+        return f"🧹 กำลังลบข้อความ… **{job.deleted}**/{job.limit} ข้อความ"
+    text = f"🧹 ลบข้อความไปแล้ว **{job.deleted}** ข้อความ"
+    if job.cancelled:
+        text += " (หยุดกลางคันแล้ว)"
+    if job.error == "forbidden":
+        text += "\n❌ บอทไม่มีสิทธิ์ลบข้อความในช่องนี้"
+    elif job.error:
+        text += f"\n⚠️ หยุดก่อนเสร็จเพราะ Discord ตอบกลับผิดพลาด ({job.error})"
+    if job.failed:
+        text += f"\n⚠️ ลบไม่สำเร็จ {job.failed} ข้อความ"
+    return text
+
+
+class PurgeCancelView(discord.ui.View):
+    def __init__(self, job: PurgeJob, user_id: int):
+        super().__init__(timeout=None)
+        self.job = job
+        self.user_id = user_id
+
+    @discord.ui.button(label="⏹️ หยุดลบ", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Long purges move their status into the channel, where anyone can see the button
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ เฉพาะคนที่สั่งลบเท่านั้นที่หยุดได้", ephemeral=True)
+            return
+        self.job.cancel()
+        button.disabled = True
+        await interaction.response.edit_message(content="⏹️ กำลังหยุด…", view=self)
 
 
 class PurgeModal(discord.ui.Modal, title="ลบข้อความจำนวนมาก"):
@@ -434,23 +487,57 @@ class PurgeModal(discord.ui.Modal, title="ลบข้อความจำน
             await interaction.response.send_message("❌ กรุณาใส่ตัวเลขระหว่าง 1 ถึง 1000", ephemeral=True)
             return
 
-        await interaction.response.defer(ephemeral=True)
-        deleted = await interaction.channel.purge(limit=count)
-        await interaction.followup.send(f"🧹 ลบข้อความไปแล้ว **{len(deleted)}** ข้อความ", ephemeral=True)
+        channel = interaction.channel
+        if channel.id in ACTIVE_PURGES:
+            await interaction.response.send_message("⏳ กำลังลบข้อความในช่องนี้อยู่แล้ว", ephemeral=True)
+            return
 
-        data = _load_data()
-        info = data.get(str(interaction.channel_id), {})
-        pins = await interaction.channel.pins()
-        dashboard_exists = any(
-            m.author == interaction.client.user and m.embeds and m.embeds[0].title == DASHBOARD_TITLE
-            for m in pins
+        info = _channel_info(channel.id, _load_data())
+        # Older channels have no stored id, but the modal was opened from the dashboard itself
+        dashboard_id = info.get("dashboard_message_id") or (interaction.message.id if interaction.message else None)
+        bot_user = interaction.client.user
+        job = PurgeJob(
+            channel,
+            count,
+            check=lambda m: m.id != dashboard_id and not _is_dashboard(m, bot_user),
         )
-        if not dashboard_exists and info:
-            owner = interaction.guild.get_member(info.get("owner_id", 0)) or interaction.user
-            embed = build_dashboard_embed(interaction.channel, owner, data)
-            view = DashboardView()
-            msg = await interaction.channel.send(embed=embed, view=view)
-            await msg.pin()
+        view = PurgeCancelView(job, interaction.user.id)
+        ACTIVE_PURGES[channel.id] = job
+
+        try:
+            await interaction.response.defer(ephemeral=True)
+            followup = await interaction.followup.send(_purge_status(job), view=view, ephemeral=True, wait=True)
+            status = followup
+
+            async def on_progress(job: PurgeJob) -> None:
+                nonlocal status
+                content = _purge_status(job)
+                current_view = None if job.finished else view
+                if status is followup:
+                    if job.elapsed < FOLLOWUP_LIFETIME:
+                        try:
+                            await followup.edit(content=content, view=current_view)
+                            return
+                        except discord.HTTPException:
+                            if not job.finished:
+                                raise
+                    # The token is about to expire (or already has): carry on in a channel message
+                    status = await channel.send(
+                        f"{interaction.user.mention} {content}",
+                        view=current_view,
+                        allowed_mentions=discord.AllowedMentions(users=[interaction.user]),
+                    )
+                    try:
+                        await followup.edit(content="🧹 ย้ายสถานะการลบไปเป็นข้อความในช่องแล้ว", view=None)
+                    except discord.HTTPException:
+                        pass
+                    return
+                await status.edit(content=f"{interaction.user.mention} {content}", view=current_view)
+
+            await job.run(on_progress)
+        finally:
+            ACTIVE_PURGES.pop(channel.id, None)
+            view.stop()
 
 
 class ConfirmDeleteView(discord.ui.View):
@@ -539,6 +626,7 @@ async def _create_channel_for_user(
     view = DashboardView()
     dashboard_msg = await channel.send(embed=embed, view=view)
     await dashboard_msg.pin()
+    _remember_dashboard(channel.id, dashboard_msg.id)
 
     try:
         dm_embed = discord.Embed(
@@ -9,6 +9,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 from utils.helpers import get_uptime, get_bangkok_time
+from utils.instrumentation import INSTRUMENTATION
 
 
 class Owner(commands.Cog):
@@ -216,6 +217,14 @@ class Owner(commands.Cog):
                 await ctx.send("❌ No cogs are currently loaded.")
             return
 
+        if action in ("perf", "latency", "metrics"):
+            await ctx.send(embed=self.perf_embed(params[0] if params else None))
+            return
+
+        if action in ("loglevel", "loglevels", "ll"):
+            await ctx.send(self.loglevel_message(params))
+            return
+
         if action in ("shutdown", "stop"):
             await ctx.send("🛑 Shutting down bot...")
             await self.bot.close()
@@ -228,6 +237,51 @@ class Owner(commands.Cog):
 
         await ctx.send("❌ Unknown action. Use `!bot help` for usage.")
 
+    def perf_embed(self, sort: Optional[str] = None, top: int = 15) -> discord.Embed:
+        snapshot = INSTRUMENTATION.snapshot()
+        lag = snapshot["event_loop_lag"]
+        embed = discord.Embed(title="⏱️ Command Latency", color=discord.Color.blue())
+        embed.description = (
+            f"Event loop lag: p50 `{lag['p50_ms']}ms` • p99 `{lag['p99_ms']}ms` • "
+            f"max `{lag['max_ms']}ms` • last `{lag['last_ms']}ms`"
+        )
+        field = "completion" if sort == "completion" else "first_response"
+        rows = sorted(
+            snapshot["commands"].items(),
+            key=lambda item: item[1][field]["p95_ms"],
+            reverse=True,
+        )[:top]
+        for key, stats in rows:
+            first, done = stats["first_response"], stats["completion"]
+            value = f"first: p50 `{first['p50_ms']}` p95 `{first['p95_ms']}` p99 `{first['p99_ms']}` ms (n={first['count']})"
+            if done["count"]:
+                value += f"\ndone: p50 `{done['p50_ms']}` p95 `{done['p95_ms']}` p99 `{done['p99_ms']}` ms (n={done['count']})"
+            embed.add_field(name=key, value=value, inline=False)
+        if not rows:
+            embed.add_field(name="No data", value="No commands recorded yet.", inline=False)
+        embed.set_footer(text=f"Sorted by p95 {field.replace('_', ' ')}")
+        return embed
+
+    def loglevel_message(self, params: tuple[str, ...]) -> str:
+        manager = getattr(self.bot, "log_levels", None)
+        if manager is None:
+            return "❌ Log level manager is not available."
+        if len(params) == 1 and params[0].lower() == "reset":
+            try:
+                manager.reset()
+            except ValueError as e:
+                return f"❌ Failed: {e}"
+            return "✅ Log levels reset to LOG_LEVEL / LOG_LEVELS."
+        if len(params) == 2:
+            try:
+                return f"✅ {manager.set_level(params[0], params[1], existing_only=True)}"
+            except ValueError as e:
+                return f"❌ {e}"
+        if params:
+            return "❌ Usage: `loglevel [<handler|module|base> <level>]` or `loglevel reset`"
+        lines = "\n".join(f"{target}: {level}" for target, level in manager.describe().items())
+        return f"📊 Current log levels:\n```\n{lines}\n```"
+
     @bot.error
     async def bot_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
         if isinstance(error, commands.NotOwner):
@@ -240,7 +294,7 @@ class Owner(commands.Cog):
         return interaction.user.id == owner_id
 
     async def action_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        actions = ["restart", "shutdown", "reload", "load", "unload", "sync", "cogs", "profile", "pause", "resume"]
+        actions = ["restart", "shutdown", "reload", "load", "unload", "sync", "cogs", "profile", "pause", "resume", "loglevel", "perf"]
         return [app_commands.Choice(name=action, value=action) for action in actions if action.startswith(current.lower())]
 
     @app_commands.command(name="botcontrol", description="Bot control panel (Owner only)")
@@ -334,6 +388,15 @@ class Owner(commands.Cog):
             await interaction.followup.send(embed=discord.Embed(title="▶️ Resumed", description="Status cycling resumed", color=discord.Color.green()), ephemeral=True)
             return
 
+        if action == "perf":
+            await interaction.followup.send(embed=self.perf_embed(args), ephemeral=True)
+            return
+
+        if action == "loglevel":
+            params = tuple(args.split()) if args else ()
+            await interaction.followup.send(self.loglevel_message(params), ephemeral=True)
+            return
+
         await interaction.followup.send(f"❌ Unknown action: `{action}`", ephemeral=True)
 
 
@@ -14,6 +14,8 @@ import qrcode
 from qrcode.constants import ERROR_CORRECT_H
 from PIL import Image
 
+from utils.metrics import QR_RENDER_DURATION, STORAGE_FLUSH_DURATION
+
 LOGO_PATH: str = "promptpay_logo.png" 
 
 # =========================
@@ -56,6 +58,10 @@ def generate_payload(pp_number, amount=0.0):
     return raw_payload
 
 def create_qr_with_logo(pp_number, amount):
+    with QR_RENDER_DURATION.time():
+        return _render_qr_with_logo(pp_number, amount)
+
+def _render_qr_with_logo(pp_number, amount):
     try:
         data = generate_payload(pp_number, amount)
     except: return None, None
@@ -124,7 +130,7 @@ def load_payment_history():
 def save_payment_history(history):
     """บันทึกประวัติการชำระเงิน"""
     try:
-        with open(PAYMENT_LOG_FILE, 'w', encoding='utf-8') as f:
+        with STORAGE_FLUSH_DURATION.time(store="payment_history"), open(PAYMENT_LOG_FILE, 'w', encoding='utf-8') as f:
             json.dump(history, f, ensure_ascii=False, indent=2)
     except Exception as e:
         print(f"Error saving payment history: {e}")
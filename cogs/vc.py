@@ -1,11 +1,22 @@
 import asyncio
-import io
+import logging
+import os
 from datetime import datetime
 from typing import Any, Optional
 
 import discord
 from discord.ext import commands
-from gtts import gTTS
+
+from utils.metrics import register_queue, unregister_queue
+from utils.tts_cache import CACHE_DIR, NAME_DISK_BYTES, NAME_MEMORY_BYTES, AudioCache, Packets, cache_key
+from utils.tts_queue import GuildTTSQueue, TTSItem
+from utils.tts_sessions import TTSSessionRegistry
+from utils.tts_engines import EngineSelector
+from utils.tts_synth import run_synth, synthesize_opus
+from utils.tts_text import detect_language, normalize
+from utils.voice_supervisor import VoiceSupervisor
+
+logger = logging.getLogger("entrophy.tts")
 
 
 class VCInfoView(discord.ui.View):
@@ -28,6 +39,14 @@ class VCInfoView(discord.ui.View):
         embed.add_field(name="Muted", value="🔇 Yes" if vc.mute else "🔊 No", inline=True)
         embed.add_field(name="Deafened", value="🔇 Yes" if vc.deaf else "🔊 No", inline=True)
         embed.add_field(name="Users", value=len(vc.channel.members), inline=True)
+        health = self.cog.supervisor.health().get(str(guild.id))
+        if health:
+            latency = f"{health['latency_ms']} ms" if health["latency_ms"] is not None else "n/a"
+            embed.add_field(
+                name="Health",
+                value=f"Latency: {latency}\nIdle: {health['idle_seconds']:.0f}s\nReconnects: {health['reconnects']}",
+                inline=True,
+            )
         embed.timestamp = datetime.now()
         return embed
 
@@ -113,7 +132,7 @@ class VCPanelView(discord.ui.View):
             return
 
         try:
-            await interaction.guild.voice_client.disconnect()
+            await self.cog.leave_voice(interaction.guild)
             await self.update_message(interaction)
         except Exception as e:
             await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
@@ -164,6 +183,120 @@ class VCPanelView(discord.ui.View):
 class VC(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.sessions = TTSSessionRegistry().load()
+        self._restore_task: Optional[asyncio.Task] = None
+        self.tts_queues: dict[int, GuildTTSQueue] = {}
+        self.supervisor = VoiceSupervisor(bot, on_release=self.voice_released)
+        bot.voice_supervisor = self.supervisor
+        self.engines = EngineSelector()
+        self.phrase_cache = AudioCache(os.path.join(CACHE_DIR, "phrases")).scan()
+        self.name_cache = AudioCache(os.path.join(CACHE_DIR, "names"), NAME_MEMORY_BYTES, NAME_DISK_BYTES).scan()
+        register_queue("tts", lambda: sum(len(q) for q in self.tts_queues.values()))
+
+    async def cog_load(self):
+        self.supervisor.start()
+        self.sessions.start()
+        self.route_channels()
+        self._restore_task = asyncio.create_task(self.restore_sessions())
+
+    def cog_unload(self):
+        self.supervisor.stop()
+        self.sessions.stop()
+        if self._restore_task is not None:
+            self._restore_task.cancel()
+        self.bot.router.remove("tts")
+        unregister_queue("tts")
+        for queue in self.tts_queues.values():
+            queue.close()
+        self.tts_queues.clear()
+
+    def tts_queue(self, guild: discord.Guild) -> GuildTTSQueue:
+        queue = self.tts_queues.get(guild.id)
+        if queue is None:
+            queue = self.tts_queues[guild.id] = GuildTTSQueue(
+                guild, self.synthesize, on_play=lambda: self.supervisor.note_audio(guild.id)
+            )
+        return queue
+
+    def close_tts_queue(self, guild_id: int) -> None:
+        queue = self.tts_queues.pop(guild_id, None)
+        if queue is not None:
+            queue.close()
+
+    def end_tts_session(self, guild_id: int) -> bool:
+        """Stop listening everywhere in the guild and drop its queue; True if anything was active."""
+        removed = self.sessions.end(guild_id)
+        if removed:
+            self.route_channels()
+        queue = self.tts_queues.get(guild_id)
+        was_playing = queue is not None and (len(queue) > 0 or queue.current is not None)
+        self.close_tts_queue(guild_id)
+        return bool(removed) or was_playing
+
+    async def restore_sessions(self):
+        """Reconnect to the voice channels that had TTS sessions before a restart."""
+        await self.bot.wait_until_ready()
+        for guild_id, voice_channel_id in list(self.sessions.voice.items()):
+            guild = self.bot.get_guild(guild_id)
+            channel = guild.get_channel(voice_channel_id) if guild else None
+            if not isinstance(channel, discord.VoiceChannel):
+                # Guild left or channel deleted while we were down
+                self.end_tts_session(guild_id)
+                continue
+            if guild.voice_client is None:
+                try:
+                    await channel.connect()
+                except Exception:
+                    logger.warning("Could not restore TTS session in guild %s", guild_id, exc_info=True)
+                    continue
+            logger.info("Restored TTS session in guild %s (%d channel(s))", guild_id, len(self.sessions.in_guild(guild_id)))
+
+    async def leave_voice(self, guild: discord.Guild) -> None:
+        """Deliberate leave: stop supervising first so the disconnect is not treated as a drop."""
+        self.supervisor.untrack(guild.id)
+        self.end_tts_session(guild.id)
+        if guild.voice_client is not None:
+            await guild.voice_client.disconnect()
+
+    async def voice_released(self, guild_id: int, reason: str) -> None:
+        # Idle, empty or unrecoverable: nothing should keep state for this guild
+        self.end_tts_session(guild_id)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        if member.id != self.bot.user.id or before.channel == after.channel:
+            return
+        guild_id = member.guild.id
+        if after.channel is not None:
+            # Every join and move, whichever command or panel caused it
+            self.supervisor.track(guild_id, after.channel.id)
+            self.sessions.set_voice(guild_id, after.channel.id)
+        elif guild_id in self.supervisor.guilds and not self.supervisor.is_reconnecting(guild_id):
+            # Disconnected by someone else (a moderator or the channel being deleted); do not fight it
+            await self.supervisor.release(guild_id, "disconnected externally")
+
+    async def render(self, cache: AudioCache, lang: str, text: str) -> Packets:
+        engine = self.engines.for_lang(lang)
+        if engine is None:
+            logger.warning("No TTS engine available for %r", lang)
+            return ()
+        key = cache_key(f"{engine.name}:{lang}", text)
+        return await cache.get_or_create(key, lambda: run_synth(synthesize_opus, engine, text, lang))
+
+    async def synthesize(self, item: TTSItem, text: str, is_prefix: bool) -> Packets:
+        return await self.render(self.name_cache if is_prefix else self.phrase_cache, item.lang, text)
+
+    def make_item(self, user: discord.abc.User, text: str, language: str, include_name: bool) -> Optional[TTSItem]:
+        """Normalize ``text`` into a queue item; None when nothing speakable is left."""
+        text = normalize(text)
+        if not text:
+            return None
+        lang = detect_language(text) if language == "auto" else language
+        prefix = f"{normalize(user.display_name)} says" if include_name else None
+        return TTSItem(user.id, text, lang, prefix)
+
+    def route_channels(self):
+        self.bot.router.set_channels("tts", self.sessions.listeners, self.handle_message)
 
     @commands.command(name="join", aliases=["j", "connect"])
     async def join(self, ctx, channel_id: int = None):
@@ -217,7 +350,7 @@ class VC(commands.Cog):
             await ctx.send("❌ I am not connected to a voice channel.")
             return
 
-        await ctx.voice_client.disconnect()
+        await self.leave_voice(ctx.guild)
         await ctx.send("✅ Disconnected from voice channel")
 
     @discord.app_commands.command(name="leave", description="Leave the voice channel")
@@ -226,7 +359,7 @@ class VC(commands.Cog):
             await interaction.response.send_message("❌ I am not connected to a voice channel.", ephemeral=True)
             return
 
-        await interaction.guild.voice_client.disconnect()
+        await self.leave_voice(interaction.guild)
         await interaction.response.send_message("✅ Disconnected from voice channel")
 
     @commands.command(name="vcinfo")
@@ -280,45 +413,34 @@ class VC(commands.Cog):
 
     @discord.app_commands.command(name="ttshere", description="Read messages in voice channel (Thai/English/Korean/Japanese)")
     @discord.app_commands.describe(
-        language="Language: th, en, ko, ja",
+        language="Language: auto (detect per message), th, en, ko, ja",
         include_name="Include your name before the message",
         text="Text to read (leave empty to listen for new messages)"
     )
-    async def ttshere(self, interaction: discord.Interaction, language: str = "en", include_name: bool = False, text: str = None):
+    @discord.app_commands.guild_only()
+    async def ttshere(self, interaction: discord.Interaction, language: str = "auto", include_name: bool = False, text: str = None):
         try:
             vc = interaction.guild.voice_client
             if not vc:
                 await interaction.response.send_message("❌ Not connected to voice channel.", ephemeral=True)
                 return
 
-            lang_map = {"th": "th", "en": "en", "ko": "ko", "ja": "ja"}
-            lang_code = lang_map.get(language.lower(), "en")
-
-            if not hasattr(self, "tts_listeners"):
-                self.tts_listeners = {}
+            lang_map = {"auto": "auto", "th": "th", "en": "en", "ko": "ko", "ja": "ja"}
+            lang_code = lang_map.get(language.lower(), "auto")
 
-            guild_id = interaction.guild.id
-            self.tts_listeners[guild_id] = {
-                "language": lang_code,
-                "include_name": include_name,
-                "user_id": interaction.user.id,
-                "channel": interaction.channel_id
-            }
+            self.sessions.listen(interaction.guild.id, interaction.channel_id, vc.channel.id, lang_code, include_name, interaction.user.id)
+            self.route_channels()
 
             if text:
-                speak_text = text
-                if include_name:
-                    speak_text = f"{interaction.user.display_name} says {text}"
-
-                await interaction.response.defer()
-
-                tts = gTTS(text=speak_text, lang=lang_code)
-                audio_buffer = io.BytesIO()
-                tts.write_to_fp(audio_buffer)
-                audio_buffer.seek(0)
-
-                vc.play(discord.FFmpegPCMAudio(audio_buffer, pipe=True))
-                await interaction.followup.send(f"🔊 Playing TTS ({language}): {speak_text[:100]}")
+                item = self.make_item(interaction.user, text, lang_code, include_name)
+                if item is None:
+                    await interaction.response.send_message("❌ Nothing to read after removing links, code and emoji.", ephemeral=True)
+                    return
+                if not self.tts_queue(interaction.guild).put(item):
+                    await interaction.response.send_message("❌ TTS queue is full, try again in a moment.", ephemeral=True)
+                    return
+                speak_text = f"{item.prefix} {item.text}" if item.prefix else item.text
+                await interaction.response.send_message(f"🔊 Queued TTS ({item.lang}): {speak_text[:100]}")
             else:
                 await interaction.response.send_message(
                     f"🔊 Listening for new messages in {interaction.channel.mention} (lang: {language}, include_name: {include_name})\n"
@@ -331,60 +453,53 @@ class VC(commands.Cog):
             except:
                 await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
+    async def handle_message(self, message, ctx):
+        # Checked first: one dict get, and DM channels are never registered
+        listener = self.sessions.for_channel(message.channel.id)
+        if listener is None or message.guild is None:
             return
 
-        if not hasattr(self, "tts_listeners"):
+        vc = message.guild.voice_client
+        if not vc:
             return
 
-        guild_id = message.guild.id
-        if guild_id not in self.tts_listeners:
+        item = self.make_item(message.author, message.clean_content, listener.language, listener.include_name)
+        if item is None:
             return
-
-        listener = self.tts_listeners[guild_id]
-        if message.channel.id != listener["channel"]:
+        # Dropped silently when full; the channel is moving faster than speech
+        self.tts_queue(message.guild).put(item)
+
+    @commands.command(name="ttsskip")
+    async def ttsskip(self, ctx):
+        queue = self.tts_queues.get(ctx.guild.id) if ctx.guild else None
+        if queue is None or not queue.skip():
+            await ctx.send("❌ Nothing is playing.")
             return
+        await ctx.send(f"⏭️ Skipped ({len(queue)} left in queue)")
 
-        vc = message.guild.voice_client
-        if not vc:
+    @discord.app_commands.command(name="ttsskip", description="Skip the TTS message that is playing")
+    async def slash_ttsskip(self, interaction: discord.Interaction):
+        queue = self.tts_queues.get(interaction.guild.id) if interaction.guild else None
+        if queue is None or not queue.skip():
+            await interaction.response.send_message("❌ Nothing is playing.", ephemeral=True)
             return
-
-        speak_text = message.content
-        if listener["include_name"]:
-            speak_text = f"{message.author.display_name} says {speak_text}"
-
-        try:
-            tts = gTTS(text=speak_text, lang=listener["language"])
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-
-            if vc.is_playing():
-                vc.stop()
-            vc.play(discord.FFmpegPCMAudio(audio_buffer, pipe=True))
-        except Exception:
-            pass
+        await interaction.response.send_message(f"⏭️ Skipped ({len(queue)} left in queue)")
 
     @discord.app_commands.command(name="ttsstop", description="Stop TTS playback and listening")
-    async def ttsstop(self, interaction: discord.Interaction):
-        guild_id = interaction.guild.id
-
-        if hasattr(self, "tts_listeners") and guild_id in self.tts_listeners:
-            del self.tts_listeners[guild_id]
-            stopped_listening = True
-        else:
-            stopped_listening = False
-
-        vc = interaction.guild.voice_client
-        if vc and vc.is_playing():
-            vc.stop()
-            stopped_playing = True
-        else:
-            stopped_playing = False
+    @discord.app_commands.describe(this_channel="Only stop reading this channel; other channels and playback continue")
+    @discord.app_commands.guild_only()
+    async def ttsstop(self, interaction: discord.Interaction, this_channel: bool = False):
+        if this_channel:
+            if self.sessions.stop_channel(interaction.channel_id) is None:
+                await interaction.response.send_message("❌ This channel is not being read.", ephemeral=True)
+                return
+            self.route_channels()
+            if not self.sessions.in_guild(interaction.guild.id):
+                self.close_tts_queue(interaction.guild.id)
+            await interaction.response.send_message(f"⏹️ Stopped reading {interaction.channel.mention}", ephemeral=True)
+            return
 
-        if stopped_listening or stopped_playing:
+        if self.end_tts_session(interaction.guild.id):
             await interaction.response.send_message("⏹️ Stopped TTS", ephemeral=True)
         else:
             await interaction.response.send_message("❌ Nothing is playing or listening.", ephemeral=True)
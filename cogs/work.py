@@ -1,84 +1,22 @@
 import json
 import os
 import random
-import re
 import string
 from datetime import datetime, timedelta
-from typing import Any, Optional, Sequence
+from typing import Any, Literal, Optional, Sequence
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
+from utils.correction_queue import CorrectionQueue
+from utils.metrics import STORAGE_FLUSH_DURATION, register_queue, unregister_queue
+from utils.thai_config import ThaiLayoutConfig
+from utils.thai_layout import convert_to_thai, is_likely_mistyped_thai, qwerty_to_thai_text, thai_to_qwerty_text
+
 DATA_FILE: str = "data/user_data.json"
-THAI_LAYOUT_CONFIG_FILE: str = "data/guild_thai_layout_config.json"
 TEMP_NOTE_CODES: dict[int, dict[str, Any]] = {}
 
-QWERTY_TO_THAI_MAP: dict[str, str] = {
-    'q': 'ๆ', 'w': 'ไ', 'e': 'ำ', 'r': 'พ', 't': 'ะ', 'y': 'า', 'u': 'ส', 'i': 'ด', 'o': 'ฟ', 'p': 'ก', '[': 'ฮ', ']': 'ฺ',
-    'a': 'ฤ', 's': 'ฆ', 'd': 'ฏ', 'f': 'โ', 'g': 'ฌ', 'h': '็', 'j': '๋', 'k': 'ษ', 'l': 'ศ', ';': 'ซ', "'": 'ฅ',
-    'z': 'ผ', 'x': 'ป', 'c': 'ฉ', 'v': 'ฮ', 'b': 'ิ', 'n': 'ื', 'm': 'ท', ',': 'ม', '.': 'ใ', '/': 'ฝ',
-    '1': '๑', '2': '๒', '3': '๓', '4': '๔', '5': '๕', '6': '๖', '7': '๗', '8': '๘', '9': '๙', '0': '๐'
-}
-
-
-def qwerty_to_thai_text(text: str) -> str:
-    """Convert a string typed on QWERTY to Thai keyboard characters."""
-    result_chars = []
-    for char in text:
-        lower = char.lower()
-        if lower in QWERTY_TO_THAI_MAP:
-            thai_char = QWERTY_TO_THAI_MAP[lower]
-            result_chars.append(thai_char)
-        else:
-            result_chars.append(char)
-    return ''.join(result_chars)
-
-
-def convert_to_thai(text: str) -> str:
-    """Alias for QWERTY->Thai conversion."""
-    return qwerty_to_thai_text(text)
-
-
-def load_thai_layout_config():
-    os.makedirs('data', exist_ok=True)
-    if not os.path.exists(THAI_LAYOUT_CONFIG_FILE):
-        return {}
-    try:
-        with open(THAI_LAYOUT_CONFIG_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def save_thai_layout_config(data):
-    os.makedirs('data', exist_ok=True)
-    with open(THAI_LAYOUT_CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def is_likely_mistyped_thai(text: str) -> bool:
-    if not text or len(text.strip()) < 2:
-        return False
-
-    if re.search('[\u0E00-\u0E7F]', text):
-        return False
-
-    mappable = sum(1 for c in text if c in QWERTY_TO_THAI_MAP)
-    total = sum(1 for c in text if c.isalnum() or c in "[]{};:'\",.<>/?`~!@#$%^&*()-_=+")
-    if total == 0:
-        return False
-
-    ratio = mappable / total
-    words = [w for w in re.split(r'\s+', text.strip()) if w]
-
-    if ratio >= 0.55 and len(words) > 1:
-        return True
-    if ratio >= 0.70 and len(text) >= 4:
-        return True
-
-    return False
-
 
 class TodoListView(discord.ui.View):
     """Interactive view for todo list management"""
@@ -663,7 +601,7 @@ def save_user_data(user_id: int, data: list[dict], notes: bool = False) -> None:
     else:
         all_data[user_key]["todos"] = data
     
-    with open(DATA_FILE, 'w') as f:
+    with STORAGE_FLUSH_DURATION.time(store="user_data"), open(DATA_FILE, 'w') as f:
         json.dump(all_data, f, indent=2)
 
 
@@ -700,22 +638,23 @@ class WorkCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.cleanup_expired_codes.start()
-        self.layout_config = load_thai_layout_config()
-
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
+        self.layout_config = ThaiLayoutConfig().load()
+        self.corrections = CorrectionQueue()
+
+    async def cog_load(self):
+        # Registered here so a cog that fails to load leaves nothing behind; mirrors cog_unload
+        self.layout_config.start()
+        register_queue("thai_corrections", lambda: self.corrections.pending_count)
+        self.bot.router.add_global("thai_autocorrect", self.handle_message)
+
+    async def handle_message(self, message: discord.Message, ctx: commands.Context):
+        # Commands are processed (once) by the router before this runs
+        if not self.layout_config.enabled_for(message.guild.id if message.guild else 0, message.channel.id, message.author.id):
             return
 
-        await self.bot.process_commands(message)
-
         if not message.content or not message.content.strip():
             return
 
-        guild_id = str(message.guild.id) if message.guild else 'dm'
-        if not self.layout_config.get(guild_id, True):
-            return
-
         if not is_likely_mistyped_thai(message.content):
             return
 
@@ -723,31 +662,45 @@ class WorkCog(commands.Cog):
         if corrected == message.content:
             return
 
-        if message.guild and message.channel.permissions_for(message.guild.me).manage_messages:
-            try:
-                await message.edit(content=corrected)
-                await message.channel.send(f"✍️ {message.author.mention}, ปรับข้อความของคุณเป็นไทยเรียบร้อยแล้ว")
-                return
-            except Exception:
-                pass
-
-        await message.reply(f"🔁 ดูเหมือนคุณพิมพ์คีย์บอร์ดผิด ลองดูข้อความที่แก้ไขแล้ว:\n{corrected}", mention_author=False)
+        # Replies are batched per channel and rate limited; see utils/correction_queue.py
+        self.corrections.submit(message, corrected)
 
     @commands.command(name='thai_layout_toggle')
     @commands.has_permissions(administrator=True)
     async def thai_layout_toggle(self, ctx: commands.Context, enabled: bool):
-        guild_id = str(ctx.guild.id) if ctx.guild else 'dm'
-        self.layout_config[guild_id] = enabled
-        save_thai_layout_config(self.layout_config)
+        self.layout_config.set_guild(ctx.guild.id if ctx.guild else None, enabled)
         await ctx.send(f"✅ QWERTY->Thai autocorrect is now {'enabled' if enabled else 'disabled'}.")
 
+    @commands.command(name='thai_layout_channel')
+    @commands.has_permissions(manage_channels=True)
+    async def thai_layout_channel(self, ctx: commands.Context, enabled: Optional[bool] = None):
+        self.layout_config.set_channel(ctx.channel.id, enabled)
+        if enabled is None:
+            await ctx.send("✅ This channel now follows the server's autocorrect setting.")
+        else:
+            await ctx.send(f"✅ QWERTY->Thai autocorrect is now {'enabled' if enabled else 'disabled'} in this channel.")
+
+    @commands.command(name='thai_autocorrect_me')
+    async def thai_autocorrect_me(self, ctx: commands.Context, enabled: bool):
+        self.layout_config.set_user(ctx.author.id, enabled)
+        await ctx.send(f"✅ QWERTY->Thai autocorrect is now {'on' if enabled else 'off'} for your messages.")
+
     @app_commands.command(name='thai_layout_toggle', description='Enable/disable QWERTY->Thai autocorrection')
+    @app_commands.describe(scope="Apply to the whole server or only this channel")
     @app_commands.checks.has_permissions(administrator=True)
-    async def thai_layout_toggle_slash(self, interaction: discord.Interaction, enabled: bool):
-        guild_id = str(interaction.guild.id) if interaction.guild else 'dm'
-        self.layout_config[guild_id] = enabled
-        save_thai_layout_config(self.layout_config)
-        await interaction.response.send_message(f"✅ QWERTY->Thai autocorrect is now {'enabled' if enabled else 'disabled'}.", ephemeral=True)
+    async def thai_layout_toggle_slash(self, interaction: discord.Interaction, enabled: bool, scope: Literal["server", "channel"] = "server"):
+        if scope == "channel":
+            self.layout_config.set_channel(interaction.channel_id, enabled)
+            where = "in this channel"
+        else:
+            self.layout_config.set_guild(interaction.guild.id if interaction.guild else None, enabled)
+            where = "for this server"
+        await interaction.response.send_message(f"✅ QWERTY->Thai autocorrect is now {'enabled' if enabled else 'disabled'} {where}.", ephemeral=True)
+
+    @app_commands.command(name='thai_autocorrect_me', description='Turn QWERTY->Thai autocorrection of your own messages on or off')
+    async def thai_autocorrect_me_slash(self, interaction: discord.Interaction, enabled: bool):
+        self.layout_config.set_user(interaction.user.id, enabled)
+        await interaction.response.send_message(f"✅ QWERTY->Thai autocorrect is now {'on' if enabled else 'off'} for your messages.", ephemeral=True)
 
     @commands.command(name='qwerty_to_thai')
     async def qwerty_to_thai_cmd(self, ctx: commands.Context, *, text: str):
@@ -759,6 +712,16 @@ class WorkCog(commands.Cog):
         converted = convert_to_thai(text)
         await interaction.response.send_message(f"🔁 Converted text:\n{converted}", ephemeral=True)
 
+    @commands.command(name='thai_to_qwerty')
+    async def thai_to_qwerty_cmd(self, ctx: commands.Context, *, text: str):
+        converted = thai_to_qwerty_text(text)
+        await ctx.send(f"🔁 Converted text:\n{converted}")
+
+    @app_commands.command(name='ttq', description='Convert text typed on the Thai layout back to QWERTY')
+    async def thai_to_qwerty_cmd_slash(self, interaction: discord.Interaction, text: str):
+        converted = thai_to_qwerty_text(text)
+        await interaction.response.send_message(f"🔁 Converted text:\n{converted}", ephemeral=True)
+
     @tasks.loop(minutes=1)
     async def cleanup_expired_codes(self):
         """Periodically clean up expired temporary codes"""
@@ -769,8 +732,12 @@ class WorkCog(commands.Cog):
         await self.bot.wait_until_ready()
     
     def cog_unload(self):
-        """Stop the cleanup task when cog is unloaded"""
+        """Stop the cleanup task and autocorrect routing when cog is unloaded"""
         self.cleanup_expired_codes.cancel()
+        self.bot.router.remove("thai_autocorrect")
+        self.layout_config.stop()
+        self.corrections.close()
+        unregister_queue("thai_corrections")
 
     @app_commands.command(name="todo", description="Manage your todo list")
     @discord.app_commands.allowed_installs(guilds=True, users=True)
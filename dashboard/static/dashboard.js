@@ -0,0 +1,92 @@
+(function () {
+  'use strict';
+
+  var REFRESH_MS = 5000;
+  var MAX_COMMANDS = 50;
+
+  function text(id, value) {
+    document.getElementById(id).textContent = value;
+  }
+
+  function list(id, items) {
+    var ul = document.getElementById(id);
+    ul.textContent = '';
+    if (!items.length) {
+      var empty = document.createElement('li');
+      empty.className = 'muted';
+      empty.textContent = 'none';
+      ul.appendChild(empty);
+      return;
+    }
+    items.forEach(function (item) {
+      var li = document.createElement('li');
+      li.textContent = item;
+      ul.appendChild(li);
+    });
+  }
+
+  function render(data) {
+    var status = document.getElementById('status');
+    status.textContent = data.status;
+    status.className = 'value status-' + data.status;
+
+    var gateway = data.gateway || {};
+    var shards = gateway.shards || [];
+    text('uptime', data.uptime || '–');
+    text('gateway', gateway.connected ? 'connected' : 'disconnected');
+    text('latency', shards.length && shards[0].latency_ms != null ? shards[0].latency_ms + ' ms' : '–');
+    text('guilds', data.guilds);
+    text('lag', data.event_loop_lag_ms + ' ms');
+
+    list('cogs', data.cogs || []);
+    var queues = data.queues || {};
+    list('queues', Object.keys(queues).map(function (name) { return name + ': ' + queues[name]; }));
+
+    var recent = document.getElementById('recent');
+    recent.textContent = (data.recent_logs || []).join('\n');
+    text('updated', 'Updated ' + new Date(data.timestamp).toLocaleTimeString());
+  }
+
+  function refresh() {
+    fetch('/status', { cache: 'no-cache' })
+      .then(function (r) { return r.json(); })
+      .then(render)
+      .catch(function () {
+        var status = document.getElementById('status');
+        status.textContent = 'offline';
+        status.className = 'value status-offline';
+      });
+  }
+
+  function feed() {
+    var box = document.getElementById('commands');
+    var first = true;
+    var source = new EventSource('/events?types=command,error');
+
+    function add(event, className) {
+      var data = JSON.parse(event.data);
+      if (first) {
+        box.textContent = '';
+        first = false;
+      }
+      var div = document.createElement('div');
+      div.className = 'line ' + className;
+      var where = data.guild ? data.guild + ' #' + data.channel : 'DM';
+      var textLine = data.time.slice(11, 19) + ' ' + data.type + ' ' + data.command + ' by ' + data.user + ' in ' + where;
+      if (data.error) textLine += ' ✗ ' + data.error + ': ' + data.message;
+      div.textContent = textLine;
+      box.insertBefore(div, box.firstChild);
+      while (box.childNodes.length > MAX_COMMANDS) box.removeChild(box.lastChild);
+    }
+
+    source.addEventListener('command', function (event) { add(event, 'INFO'); });
+    source.addEventListener('error', function (event) {
+      // Named "error" events carry data; connection errors do not
+      if (event.data) add(event, 'ERROR');
+    });
+  }
+
+  refresh();
+  setInterval(refresh, REFRESH_MS);
+  feed();
+})();
@@ -0,0 +1,120 @@
+(function () {
+  'use strict';
+
+  var MAX_LINES = 1000;
+  var LEVELS = ['VERBOSE', 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'];
+
+  var log = document.getElementById('log');
+  var info = document.getElementById('info');
+  var form = document.getElementById('filters');
+  var liveButton = document.getElementById('live');
+  var cursor = 0;
+  var source = null;
+  var backfilling = false;
+  var pending = [];
+
+  function line(record, text) {
+    var div = document.createElement('div');
+    div.className = 'line ' + record.level;
+    div.textContent = text;
+    return div;
+  }
+
+  function minLevel() {
+    return LEVELS.indexOf(form.level.value);
+  }
+
+  function trim() {
+    while (log.childNodes.length > MAX_LINES) {
+      log.removeChild(log.firstChild);
+    }
+  }
+
+  function search(event) {
+    if (event) event.preventDefault();
+    stopLive();
+    var params = new URLSearchParams({ limit: 500 });
+    ['level', 'guild', 'since', 'until'].forEach(function (name) {
+      if (form[name].value) params.set(name, form[name].value);
+    });
+    fetch('/logs?' + params.toString())
+      .then(function (r) { return r.json(); })
+      .then(function (data) {
+        if (data.error) {
+          info.textContent = data.error;
+          return;
+        }
+        log.textContent = '';
+        data.records.slice().reverse().forEach(function (record) {
+          log.appendChild(line(record, record.time + ' | ' + record.level + ' | ' + record.message));
+        });
+        log.scrollTop = log.scrollHeight;
+        info.textContent = data.count + ' records';
+      });
+  }
+
+  function append(records) {
+    var min = minLevel();
+    var atBottom = log.scrollTop + log.clientHeight >= log.scrollHeight - 4;
+    records.forEach(function (record) {
+      // Backfill and the stream can overlap; sequence numbers dedupe them
+      if (record.seq <= cursor) return;
+      cursor = record.seq;
+      if (min > 0 && LEVELS.indexOf(record.level) < min) return;
+      log.appendChild(line(record, record.text));
+    });
+    trim();
+    if (atBottom) log.scrollTop = log.scrollHeight;
+  }
+
+  // Fetch whatever the ring buffer holds past the cursor (first load or after a reconnect)
+  function backfill() {
+    backfilling = true;
+    fetch('/logs?after=' + cursor)
+      .then(function (r) { return r.json(); })
+      .then(function (data) {
+        if (data.next < cursor) cursor = 0;
+        append(data.records);
+        info.textContent = data.truncated ? 'Live (some records were dropped from the buffer)' : 'Live';
+      })
+      .catch(function () { info.textContent = 'Could not load recent records'; })
+      .then(function () {
+        backfilling = false;
+        append(pending);
+        pending = [];
+      });
+  }
+
+  function startLive() {
+    stopLive();
+    log.textContent = '';
+    cursor = 0;
+    liveButton.disabled = true;
+    source = new EventSource('/events?types=log');
+    source.addEventListener('open', backfill);
+    source.addEventListener('log', function (event) {
+      var record = JSON.parse(event.data);
+      if (backfilling) pending.push(record);
+      else append([record]);
+    });
+    source.addEventListener('overflow', function () {
+      info.textContent = 'Fell behind, reconnecting…';
+    });
+    source.addEventListener('error', function () {
+      info.textContent = 'Disconnected, reconnecting…';
+    });
+  }
+
+  function stopLive() {
+    if (source !== null) {
+      source.close();
+      source = null;
+    }
+    pending = [];
+    liveButton.disabled = false;
+  }
+
+  form.addEventListener('submit', search);
+  liveButton.addEventListener('click', startLive);
+  startLive();
+})();
@@ -1,69 +1,329 @@
-from flask import Flask, send_from_directory, send_file, jsonify
-from threading import Thread
-import os
+import asyncio
 import datetime
+import json
+import os
+import time
+from typing import Any, Optional
 
-app = Flask(__name__, static_folder=None)
+from aiohttp import web
+
+from utils.event_hub import EVENT_HUB, EVENT_TYPES
+from utils.instrumentation import INSTRUMENTATION
+from utils.log_buffer import LOG_BUFFER
+from utils.log_query import query_logs, tail_lines
+from utils.helpers import get_uptime
+from utils.metrics import CONTENT_TYPE, REGISTRY, queue_depths
+from utils.static_assets import Asset, StaticAssets
 
 # Paths to the dashboard static files
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DASH_STATIC = os.path.join(BASE_DIR, 'dashboard', 'static')
 LOG_FILE = os.path.join(BASE_DIR, 'logs', 'entrophy.log')
 
+BOT_KEY = web.AppKey('bot', Any)
+KEEPALIVE_TIMEOUT = 75.0
+STATUS_INTERVAL = float(os.getenv('STATUS_INTERVAL', '5'))
+SSE_PING_INTERVAL = 15.0
+SSE_RETRY_MS = 3000
+SSE_WRITE_BATCH = 64
+
+routes = web.RouteTableDef()
+
+
+def _gateway_state(bot: Any) -> dict[str, Any]:
+    ws = getattr(bot, 'ws', None)
+    connected = ws is not None and bool(getattr(ws, 'open', False)) and not bot.is_closed()
+
+    latencies = getattr(bot, 'latencies', None) or [(bot.shard_id, bot.latency)]
+    shards = [
+        {'shard': shard_id, 'latency_ms': round(latency * 1000, 2) if latency == latency else None}
+        for shard_id, latency in latencies
+    ]
+
+    last_ack_ago = None
+    keep_alive_thread = getattr(ws, '_keep_alive', None)
+    last_ack = getattr(keep_alive_thread, '_last_ack', None)
+    if last_ack is not None:
+        last_ack_ago = round(time.perf_counter() - last_ack, 2)
+
+    return {'connected': connected, 'ready': bot.is_ready(), 'shards': shards, 'last_heartbeat_ack_seconds_ago': last_ack_ago}
+
+
+class StatusSnapshot:
+    """Pre-serialized ``/status`` body, rebuilt once per interval instead of per request."""
+
+    def __init__(self, bot: Any, interval: float = STATUS_INTERVAL) -> None:
+        self.bot = bot
+        self.interval = interval
+        self.body: bytes = b'{}'
+        self.built_at: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def build(self, recent: list[str]) -> bytes:
+        bot = self.bot
+        lag = INSTRUMENTATION.lag
+        voice = getattr(bot, 'voice_supervisor', None)
+        payload = {
+            'status': 'online' if bot.is_ready() else 'starting',
+            'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+            'uptime': get_uptime(getattr(bot, 'launch_time', None)),
+            'gateway': _gateway_state(bot),
+            'guilds': len(bot.guilds),
+            'cogs': sorted(bot.cogs),
+            'queues': queue_depths(),
+            'voice': voice.health() if voice is not None else {},
+            'event_loop_lag_ms': round(lag.last * 1000, 3),
+            'recent_logs': recent[::-1],
+        }
+        return json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+
+    async def refresh(self) -> bytes:
+        try:
+            recent = await asyncio.to_thread(tail_lines, LOG_FILE, 10)
+        except Exception:
+            recent = []
+        self.body = self.build(recent)
+        self.built_at = time.monotonic()
+        return self.body
 
-@app.route('/')
-def home():
+    async def current(self) -> bytes:
+        # Fallback in case the refresh task is not running
+        if time.monotonic() - self.built_at > self.interval * 2:
+            await self.refresh()
+        return self.body
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+STATUS_KEY = web.AppKey('status', StatusSnapshot)
+ASSETS_KEY = web.AppKey('assets', StaticAssets)
+
+
+def _json_error(message: str, status: int = 400) -> web.Response:
+    return web.json_response({'error': message}, status=status)
+
+
+def _serve_asset(request: web.Request, asset: Asset) -> web.Response:
+    encoding = asset.negotiate(request.headers.get('Accept-Encoding', ''))
+    headers = {
+        'ETag': asset.etag(encoding),
+        'Cache-Control': asset.cache_control,
+        'Vary': 'Accept-Encoding',
+    }
+    if asset.matches(request.headers.get('If-None-Match', '')):
+        return web.Response(status=304, headers=headers)
+
+    headers['Content-Type'] = asset.content_type
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return web.Response(body=asset.bodies[encoding], headers=headers)
+
+
+@routes.get('/')
+async def home(request: web.Request) -> web.Response:
     """Serve the dashboard main page (index.html)."""
-    index_path = os.path.join(DASH_STATIC, 'index.html')
-    if os.path.exists(index_path):
-        return send_file(index_path)
-    return "Dashboard not built", 404
+    page = request.app[ASSETS_KEY].pages.get('index.html')
+    if page is None:
+        return web.Response(text="Dashboard not built", status=404)
+    return _serve_asset(request, page)
 
 
-@app.route('/log')
-def logs_page():
+@routes.get('/log')
+async def logs_page(request: web.Request) -> web.Response:
     """Serve the full logs page (logs.html)."""
-    logs_path = os.path.join(DASH_STATIC, 'logs.html')
-    if os.path.exists(logs_path):
-        return send_file(logs_path)
-    return "Logs page not found", 404
+    page = request.app[ASSETS_KEY].pages.get('logs.html')
+    if page is None:
+        return web.Response(text="Logs page not found", status=404)
+    return _serve_asset(request, page)
+
+
+@routes.get('/static/{filename:.+}')
+async def static_files(request: web.Request) -> web.Response:
+    """Serve dashboard assets from memory; fingerprinted names are cached as immutable."""
+    asset = request.app[ASSETS_KEY].get(request.match_info['filename'])
+    if asset is None:
+        raise web.HTTPNotFound()
+    return _serve_asset(request, asset)
 
 
-@app.route('/static/<path:filename>')
-def static_files(filename):
-    """Serve static assets for the dashboard."""
-    return send_from_directory(DASH_STATIC, filename)
+@routes.get('/status')
+async def status(request: web.Request) -> web.Response:
+    """Return the cached JSON health snapshot (gateway, shards, cogs, queues, recent logs)."""
+    body = await request.app[STATUS_KEY].current()
+    return web.Response(body=body, content_type='application/json', headers={'Cache-Control': 'no-cache'})
 
 
-@app.route('/status')
-def status():
-    """Return a simple JSON status and a few recent log lines for quick checks."""
-    now = datetime.datetime.utcnow().isoformat() + 'Z'
-    recent = []
+@routes.get('/logs')
+async def logs_query(request: web.Request) -> web.Response:
+    """Query the log files (including rotated backups), newest first.
+
+    Filters: ``level`` (minimum), ``since``/``until`` (epoch or ISO),
+    ``guild`` (name substring) and ``limit`` (max 1000).
+
+    With ``after=<seq>`` the in-memory ring buffer is polled instead and only
+    records newer than that cursor are returned, oldest first.
+    """
+    args = request.query
+    if 'after' in args:
+        return logs_poll(args)
+
+    try:
+        limit = max(1, min(int(args.get('limit', 100)), 1000))
+        # File reads happen off the event loop
+        records = await asyncio.to_thread(
+            query_logs,
+            LOG_FILE,
+            level=args.get('level'),
+            since=args.get('since'),
+            until=args.get('until'),
+            guild=args.get('guild'),
+            limit=limit,
+        )
+    except ValueError as e:
+        return _json_error(str(e))
+
+    return web.json_response({'count': len(records), 'records': records})
+
+
+def logs_poll(args: Any) -> web.Response:
     try:
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.read().splitlines()
-                recent = lines[-10:]
-    except Exception:
-        recent = []
-
-    return jsonify({
-        'status': 'online',
-        'timestamp': now,
-        'recent_logs': recent[::-1]
+        after = int(args.get('after', 0))
+        limit = max(1, min(int(args.get('limit', LOG_BUFFER.capacity)), LOG_BUFFER.capacity))
+    except ValueError:
+        return _json_error('after and limit must be integers')
+
+    if after > LOG_BUFFER.last_seq:
+        # Cursor from before a restart; sequence numbers started over
+        after = 0
+
+    records, truncated = LOG_BUFFER.since(after, limit)
+    # Clients pass `next` back as `after` on their next poll
+    next_seq = records[-1]['seq'] if records else after
+    return web.json_response({
+        'next': next_seq,
+        'last': LOG_BUFFER.last_seq,
+        'truncated': truncated,
+        'records': records,
+    })
+
+
+@routes.get('/events')
+async def events(request: web.Request) -> web.StreamResponse:
+    """Server-Sent Events stream of ``log``, ``command`` and ``error`` events.
+
+    ``types=log,command`` limits the stream. Clients that fall too far behind
+    receive an ``overflow`` event and are disconnected; ``EventSource``
+    reconnects on its own.
+    """
+    requested = request.query.get('types')
+    types = None
+    if requested:
+        types = frozenset(t.strip() for t in requested.split(',')) & frozenset(EVENT_TYPES)
+        if not types:
+            return _json_error(f"types must be some of: {', '.join(EVENT_TYPES)}")
+
+    subscriber = EVENT_HUB.subscribe(types)
+    if subscriber is None:
+        return _json_error('Too many event stream clients', status=503)
+
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
     })
+    try:
+        await response.prepare(request)
+        await response.write(f'retry: {SSE_RETRY_MS}\n\n'.encode())
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), SSE_PING_INTERVAL)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                frame = b': ping\n\n'
+            # Coalesce whatever else is already queued into one write
+            frames = [frame]
+            while frame is not None and len(frames) < SSE_WRITE_BATCH and not subscriber.queue.empty():
+                frame = subscriber.queue.get_nowait()
+                frames.append(frame)
+            if frame is None:
+                frames.pop()
+                if subscriber.overflowed:
+                    frames.append(b'event: overflow\ndata: {}\n\n')
+                if frames:
+                    await response.write(b''.join(frames))
+                break
+            await response.write(b''.join(frames))
+    except ConnectionResetError:
+        pass
+    finally:
+        EVENT_HUB.unsubscribe(subscriber)
+    return response
+
+
+@routes.get('/metrics')
+async def metrics(request: web.Request) -> web.Response:
+    """Prometheus text exposition; ``?format=json`` returns latency percentiles instead."""
+    if request.query.get('format') == 'json':
+        return web.json_response(INSTRUMENTATION.snapshot())
+    return web.Response(body=REGISTRY.render(), headers={'Content-Type': CONTENT_TYPE})
+
+
+async def _start_background(app: web.Application) -> None:
+    app[STATUS_KEY].start()
+
 
+async def _stop_background(app: web.Application) -> None:
+    app[STATUS_KEY].stop()
 
-def run():
+
+async def _close_streams(app: web.Application) -> None:
+    EVENT_HUB.close_all()
+
+
+def create_app(bot: Any) -> web.Application:
+    app = web.Application()
+    app[BOT_KEY] = bot
+    app[STATUS_KEY] = StatusSnapshot(bot)
+    # Read, fingerprint and compress the dashboard once at startup
+    app[ASSETS_KEY] = StaticAssets(DASH_STATIC).load()
+    app.add_routes(routes)
+    app.on_startup.append(_start_background)
+    app.on_shutdown.append(_close_streams)
+    app.on_cleanup.append(_stop_background)
+    return app
+
+
+async def start_web_server(bot: Any) -> web.AppRunner:
+    """Start the dashboard/health server on the bot's own event loop."""
     # Bind to the PORT env var if present (Render uses $PORT)
     port = int(os.getenv('PORT', '8080'))
     host = os.getenv('KEEPALIVE_HOST', '0.0.0.0')
-    # Flask in Render should use 0.0.0.0 and the provided PORT
-    app.run(host=host, port=port)
+    runner = web.AppRunner(create_app(bot), access_log=None, keepalive_timeout=KEEPALIVE_TIMEOUT)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
+
+
+def keep_alive_enabled() -> bool:
+    return os.getenv("KEEP_ALIVE", "false").lower() in ("1", "true", "yes")
 
 
-def keep_alive():
-    t = Thread(target=run)
-    t.daemon = True
-    t.start()
+async def stop_web_server(runner: Optional[web.AppRunner]) -> None:
+    if runner is not None:
+        await runner.cleanup()
@@ -10,9 +10,15 @@ from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from keep_alive import keep_alive_enabled, start_web_server, stop_web_server
 from utils.advanced_logger import setup_advanced_logger, LogLevel, log_command_execution, log_error, log_event
 from utils.discord_logger import DiscordHandler
+from utils.event_hub import EVENT_HUB
+from utils.instrumentation import INSTRUMENTATION
+from utils.log_config import LevelFileWatcher, LevelManager
+from utils.metrics import COMMAND_ERRORS_TOTAL, COMMANDS_TOTAL, register_bot, register_queue
 from utils.log_buffer import BufferHandler
+from utils.message_router import MessageRouter
 
 load_dotenv()
 
@@ -34,11 +40,15 @@ bot: commands.Bot = commands.Bot(
 )
 
 bot.launch_time: datetime = datetime.now(timezone.utc)
+bot.router = MessageRouter(bot)
+INSTRUMENTATION.install(bot)
+register_bot(bot)
 
 logger: Any = setup_advanced_logger("entrophy", level=LogLevel.VERBOSE)
 
 try:
     buf = BufferHandler()
+    buf.set_name("buffer")
     logger.addHandler(buf)
 except Exception:
     logger.exception("Failed to attach BufferHandler")
@@ -52,20 +62,32 @@ try:
         encoding="utf-8"
     )
     from utils.advanced_logger import AdvancedFormatter
+    file_handler.set_name("file")
     file_handler.setFormatter(AdvancedFormatter())
     logger.addHandler(file_handler)
 except Exception:
     logger.exception("Failed to attach file handler")
 
+# Handlers start wide open; LOG_LEVEL / LOG_LEVELS and config/log_levels.json narrow them at runtime
+bot.log_levels = LevelManager(logger)
+try:
+    bot.log_levels.apply_env()
+except ValueError:
+    logger.exception("Invalid LOG_LEVEL / LOG_LEVELS, keeping defaults")
+log_level_watcher = LevelFileWatcher(bot.log_levels)
+
 
 async def attach_discord_logger() -> None:
     if not LOG_CHANNEL_ID:
         return
     try:
         discord_handler = DiscordHandler(bot, int(LOG_CHANNEL_ID))
+        discord_handler.set_name("discord")
         from utils.advanced_logger import AdvancedFormatter
         discord_handler.setFormatter(AdvancedFormatter())
         logger.addHandler(discord_handler)
+        bot.log_levels.sync()
+        register_queue("discord_log", discord_handler.queue.qsize)
         try:
             await discord_handler.start()
         except Exception:
@@ -81,6 +103,14 @@ async def combined_setup() -> None:
     if original_setup:
         await original_setup()
     await attach_discord_logger()
+    await log_level_watcher.start()
+    await INSTRUMENTATION.start()
+    if keep_alive_enabled():
+        try:
+            bot.web_runner = await start_web_server(bot)
+            logger.info("keep_alive enabled")
+        except OSError:
+            logger.exception("Failed to start keep_alive web server")
 
 bot.setup_hook = combined_setup
 
@@ -91,8 +121,30 @@ async def on_ready() -> None:
     await sync_slash_commands()
 
 
+def publish_command(kind: str, name: str, user: Any, guild: Any, channel: Any, event: str = "command", **extra: Any) -> None:
+    EVENT_HUB.publish(event, {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "type": kind,
+        "command": name,
+        "user": str(user),
+        "guild": guild.name if guild else None,
+        "channel": getattr(channel, "name", None) or str(channel),
+        **extra,
+    })
+
+
+@bot.event
+async def on_message(message: discord.Message) -> None:
+    # Replaces Bot.on_message; the router processes commands itself
+    await bot.router.dispatch(message)
+
+
 @bot.event
 async def on_command(ctx: commands.Context) -> None:
+    COMMANDS_TOTAL.inc(type="prefix", command=ctx.command.qualified_name)
+    publish_command("prefix", ctx.command.qualified_name, ctx.author, ctx.guild, ctx.channel)
+    if not logger.isEnabledFor(LogLevel.INFO):
+        return
     args: str = " ".join(ctx.args[2:]) if len(ctx.args) > 2 else ""
     log_command_execution(
         logger, "prefix", ctx.command.name,
@@ -102,6 +154,10 @@ async def on_command(ctx: commands.Context) -> None:
 
 @bot.event
 async def on_app_command_completion(interaction: discord.Interaction, command: app_commands.Command) -> None:
+    COMMANDS_TOTAL.inc(type="slash", command=command.qualified_name)
+    publish_command("slash", command.qualified_name, interaction.user, interaction.guild, interaction.channel)
+    if not logger.isEnabledFor(LogLevel.INFO):
+        return
     log_command_execution(
         logger, "slash", command.name,
         interaction.user, interaction.guild, interaction.channel
@@ -110,9 +166,15 @@ async def on_app_command_completion(interaction: discord.Interaction, command: a
 
 @bot.event
 async def on_command_error(ctx: commands.Context, error: commands.CommandError) -> None:
+    COMMAND_ERRORS_TOTAL.inc(type=type(error).__name__)
     if isinstance(error, commands.CommandNotFound):
         return
-    elif isinstance(error, commands.MissingPermissions):
+    publish_command(
+        "prefix", ctx.command.qualified_name if ctx.command else "unknown",
+        ctx.author, ctx.guild, ctx.channel,
+        event="error", error=type(error).__name__, message=str(error)
+    )
+    if isinstance(error, commands.MissingPermissions):
         log_error(
             logger, "PermissionError",
             f"{ctx.author} tried to use {ctx.command.name} without permissions",
@@ -143,6 +205,8 @@ async def sync_slash_commands() -> None:
     synced: list[app_commands.Command] = await bot.tree.sync()
     log_event(logger, "SlashCommandsSync", f"Synced {len(synced)} slash commands")
 
+    if not logger.isEnabledFor(LogLevel.VERBOSE):
+        return
     try:
         for cmd in bot.tree.get_commands():
             guilds = getattr(cmd, "guilds", None)
@@ -168,16 +232,11 @@ async def load_cogs() -> None:
 async def main() -> None:
     async with bot:
         await load_cogs()
-        await bot.start(TOKEN)
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await stop_web_server(getattr(bot, "web_runner", None))
 
 
 if __name__ == "__main__":
-    try:
-        from keep_alive import keep_alive
-        if os.getenv("KEEP_ALIVE", "false").lower() in ("1", "true", "yes"):
-            keep_alive()
-            logger.info("keep_alive enabled")
-    except ImportError:
-        pass
-
     asyncio.run(main())
@@ -82,7 +82,8 @@ def setup_advanced_logger(name: str = "entrophy", level: int = LogLevel.VERBOSE)
     logger.handlers = []
 
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(LogLevel.VERBOSE)
+    console_handler.set_name("console")
+    console_handler.setLevel(level)
     formatter = AdvancedFormatter()
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
@@ -0,0 +1,140 @@
+"""Per-channel batching for Thai autocorrect replies.
+
+Instead of one reply per mistyped message, corrections are collected per
+channel for ``window`` seconds and posted together. Each channel has a send
+bucket shaped like Discord's own (5 messages per 5 seconds), so a burst never
+turns into 429s, and a user is corrected at most once per ``user_cooldown``
+seconds.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import discord
+
+from utils.metrics import THAI_CORRECTIONS_TOTAL
+from utils.rate_limit import SendBucket
+
+logger = logging.getLogger("entrophy.autocorrect")
+
+BATCH_WINDOW: float = 1.5
+USER_COOLDOWN: float = 10.0
+BUCKET_SIZE: int = 5
+BUCKET_PERIOD: float = 5.0
+MAX_BATCH: int = 10
+MESSAGE_LIMIT: int = 2000
+NO_MENTIONS = discord.AllowedMentions.none()
+
+
+class _ChannelBatch:
+    __slots__ = ("channel", "pending", "task")
+
+    def __init__(self, channel: Any) -> None:
+        self.channel = channel
+        self.pending: list[tuple[discord.Message, str]] = []
+        self.task: Optional[asyncio.Task] = None
+
+
+def _chunks(lines: list[str], header: str) -> list[str]:
+    """Join ``lines`` under ``header`` into as few messages as fit the length limit."""
+    chunks, current = [], header
+    for line in lines:
+        line = line[:MESSAGE_LIMIT - len(header) - 1]
+        if len(current) + 1 + len(line) > MESSAGE_LIMIT:
+            chunks.append(current)
+            current = header
+        current += "\n" + line
+    chunks.append(current)
+    return chunks
+
+
+class CorrectionQueue:
+    def __init__(
+        self,
+        window: float = BATCH_WINDOW,
+        user_cooldown: float = USER_COOLDOWN,
+        max_batch: int = MAX_BATCH,
+    ) -> None:
+        self.window = window
+        self.user_cooldown = user_cooldown
+        self.max_batch = max_batch
+        self._batches: dict[int, _ChannelBatch] = {}
+        self._buckets: dict[int, SendBucket] = {}
+        self._last_corrected: dict[int, float] = {}
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(batch.pending) for batch in self._batches.values())
+
+    def submit(self, message: discord.Message, corrected: str) -> bool:
+        """Queue a correction; False when the author is on cooldown or the batch is full."""
+        now = time.monotonic()
+        user_id = message.author.id
+        if now - self._last_corrected.get(user_id, float("-inf")) < self.user_cooldown:
+            THAI_CORRECTIONS_TOTAL.inc(outcome="cooldown")
+            return False
+
+        channel_id = message.channel.id
+        batch = self._batches.get(channel_id)
+        if batch is None:
+            batch = self._batches[channel_id] = _ChannelBatch(message.channel)
+        if len(batch.pending) >= self.max_batch:
+            THAI_CORRECTIONS_TOTAL.inc(outcome="dropped")
+            return False
+
+        self._last_corrected[user_id] = now
+        batch.pending.append((message, corrected))
+        THAI_CORRECTIONS_TOTAL.inc(outcome="queued")
+        if batch.task is None:
+            batch.task = asyncio.create_task(self._flush_later(channel_id, batch))
+        return True
+
+    async def _flush_later(self, channel_id: int, batch: _ChannelBatch) -> None:
+        try:
+            await asyncio.sleep(self.window)
+            # New corrections from here on start the next batch
+            if self._batches.get(channel_id) is batch:
+                del self._batches[channel_id]
+            await self._send(channel_id, batch.channel, batch.pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Failed to send autocorrect batch in channel %s", channel_id)
+        finally:
+            self._prune()
+
+    async def _send(self, channel_id: int, channel: Any, entries: list[tuple[discord.Message, str]]) -> None:
+        if not entries:
+            return
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = SendBucket(BUCKET_SIZE, BUCKET_PERIOD)
+
+        if len(entries) == 1:
+            message, corrected = entries[0]
+            await bucket.acquire()
+            await message.reply(
+                f"🔁 ดูเหมือนคุณพิมพ์คีย์บอร์ดผิด ลองดูข้อความที่แก้ไขแล้ว:\n{corrected}",
+                mention_author=False,
+                allowed_mentions=NO_MENTIONS,
+            )
+        else:
+            lines = [f"**{message.author.display_name}**: {corrected}" for message, corrected in entries]
+            for chunk in _chunks(lines, "🔁 ดูเหมือนพิมพ์คีย์บอร์ดผิด ข้อความที่แก้ไขแล้ว:"):
+                await bucket.acquire()
+                await channel.send(chunk, allowed_mentions=NO_MENTIONS)
+        THAI_CORRECTIONS_TOTAL.inc(len(entries), outcome="sent")
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.user_cooldown
+        for user_id in [uid for uid, at in self._last_corrected.items() if at < cutoff]:
+            del self._last_corrected[user_id]
+        for channel_id in [cid for cid, bucket in self._buckets.items() if cid not in self._batches and bucket.full]:
+            del self._buckets[channel_id]
+
+    def close(self) -> None:
+        for batch in self._batches.values():
+            if batch.task is not None:
+                batch.task.cancel()
+        self._batches.clear()
@@ -0,0 +1,107 @@
+"""Fan-out of live bot events (commands, errors, log records) to dashboard clients.
+
+Each event is serialized once into a Server-Sent Events frame and the same
+bytes are queued for every subscriber. Queues are bounded: a client that
+falls ``queue_size`` frames behind is disconnected instead of buffering in
+bot memory, and its browser's ``EventSource`` reconnects from scratch.
+
+``publish()`` may be called from any thread; log handlers run wherever the
+record was emitted.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Optional
+
+EVENT_QUEUE_SIZE: int = 256
+MAX_SUBSCRIBERS: int = 20
+EVENT_TYPES: tuple[str, ...] = ("log", "command", "error")
+
+
+def encode_event(event: str, data: dict[str, Any], event_id: int) -> bytes:
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscriber:
+    __slots__ = ("queue", "types", "overflowed")
+
+    def __init__(self, types: frozenset[str], queue_size: int) -> None:
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(queue_size)
+        self.types = types
+        self.overflowed: bool = False
+
+    def offer(self, frame: bytes) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and tell the stream loop to hang up
+            self.overflowed = True
+            self.close()
+
+    def close(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, max_subscribers: int = MAX_SUBSCRIBERS) -> None:
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set[Subscriber] = set()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.disconnected: int = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Remember the loop the subscribers live on so other threads can publish."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    def subscribe(self, types: Optional[frozenset[str]] = None) -> Optional[Subscriber]:
+        """Register a subscriber on the running loop; returns None when the hub is full."""
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        if self._loop is None:
+            self.bind(asyncio.get_running_loop())
+        subscriber = Subscriber(types or frozenset(EVENT_TYPES), self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.discard(subscriber)
+            if subscriber.overflowed:
+                self.disconnected += 1
+
+    def close_all(self) -> None:
+        """End every open stream (server shutdown)."""
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        # Cheap no-op while nobody has the dashboard open
+        if not self._subscribers:
+            return
+        frame = encode_event(event, data, next(self._ids))
+        if threading.get_ident() == self._loop_thread:
+            self._dispatch(event, frame)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, event, frame)
+
+    def _dispatch(self, event: str, frame: bytes) -> None:
+        for subscriber in list(self._subscribers):
+            if event in subscriber.types:
+                subscriber.offer(frame)
+
+
+EVENT_HUB: EventHub = EventHub()
@@ -0,0 +1,368 @@
+"""Command latency histograms and an event-loop lag sampler.
+
+Every prefix command, slash command and component interaction is timed from
+the moment the bot dispatches it to its first response and (for commands) to
+completion. Samples go into log-linear "HDR-style" histograms, so each
+one costs a couple of integer operations and percentiles stay within ~3%.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger("entrophy.perf")
+
+SUB_BUCKETS: int = 32
+HALF_BUCKETS: int = SUB_BUCKETS // 2
+MAX_SHIFT: int = 30
+BUCKET_COUNT: int = SUB_BUCKETS + MAX_SHIFT * HALF_BUCKETS
+PENDING_TTL: float = 15 * 60
+RESPONSE_METHODS: tuple[str, ...] = ("send_message", "defer", "edit_message", "send_modal", "autocomplete", "pong")
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    shift = micros.bit_length() - 5
+    if shift > MAX_SHIFT:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((micros >> shift) - HALF_BUCKETS)
+
+
+def _bucket_upper(index: int) -> int:
+    """Exclusive upper bound of a bucket in microseconds."""
+    if index < SUB_BUCKETS:
+        return index + 1
+    k = index - SUB_BUCKETS
+    shift = k // HALF_BUCKETS + 1
+    return ((k % HALF_BUCKETS) + HALF_BUCKETS + 1) << shift
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations, recorded in seconds and stored in microseconds."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * BUCKET_COUNT
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[_bucket_index(int(seconds * 1_000_000))] += 1
+        if self.count == 0 or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound (seconds) of the bucket holding the ``pct`` percentile."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(self.count * pct / 100 + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(_bucket_upper(index) / 1_000_000, self.max)
+        return self.max
+
+    def cumulative(self, bounds: list[float]) -> list[int]:
+        """Counts of samples at or below each bound in ``bounds`` (seconds, ascending)."""
+        result: list[int] = []
+        seen = 0
+        index = 0
+        counts = list(self.counts)
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < BUCKET_COUNT and _bucket_upper(index) <= limit:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round(self.min * 1000, 3),
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class CommandStats:
+    __slots__ = ("first_response", "completion")
+
+    def __init__(self) -> None:
+        self.first_response = LatencyHistogram()
+        self.completion = LatencyHistogram()
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.histogram = LatencyHistogram()
+        self.last: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.on_sample: Optional[Callable[[], None]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - expected)
+            self.histogram.record(self.last)
+            if self.on_sample is not None:
+                self.on_sample()
+
+
+def _component_key(interaction: discord.Interaction) -> str:
+    data = interaction.data or {}
+    custom_id = str(data.get("custom_id", ""))
+    kind = "modal" if interaction.type == discord.InteractionType.modal_submit else "component"
+    # Persistent views use readable ids like "dash:rename"; others are random per view
+    if ":" in custom_id:
+        return f"{kind}:{custom_id}"
+    return kind
+
+
+def _timed_method(name: str) -> Callable[..., Any]:
+    original = getattr(discord.InteractionResponse, name)
+
+    async def method(self: "_TimedResponse", *args: Any, **kwargs: Any) -> Any:
+        self._on_response(self._parent)
+        return await original(self, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = original.__doc__
+    return method
+
+
+class _TimedResponse(discord.InteractionResponse):
+    """``interaction.response`` for a timed interaction; reports the first reply of any kind."""
+
+    __slots__ = ("_on_response",)
+
+    def __init__(self, parent: discord.Interaction, on_response: Callable[[discord.Interaction], None]) -> None:
+        super().__init__(parent)
+        self._on_response = on_response
+
+
+for _name in RESPONSE_METHODS:
+    if hasattr(discord.InteractionResponse, _name):
+        setattr(_TimedResponse, _name, _timed_method(_name))
+
+
+class Instrumentation:
+    """Collects per-command latency histograms and the loop lag sampler.
+
+    ``install(bot)`` hooks the bot's own dispatch path: ``Bot.invoke`` for
+    prefix commands, ``CommandTree._call`` for slash commands and the view
+    store for components and modals. The clock therefore starts before any
+    command code runs, and only the context or interaction being timed gets
+    a reporting ``send``/``response``; nothing is patched on the classes.
+    """
+
+    def __init__(self) -> None:
+        self.commands: dict[str, CommandStats] = {}
+        self.lag = LoopLagMonitor()
+        self._pending: dict[int, tuple[str, float, bool]] = {}
+        self._next_prune: float = 0.0
+        self._installed: bool = False
+        # Interaction.response is a cached slot in the discord.py versions this was checked against
+        self._response_hook: bool = hasattr(discord.Interaction, "_cs_response")
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def stats(self, key: str) -> CommandStats:
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = CommandStats()
+        return stats
+
+    # --- recording ---
+
+    def begin_context(self, ctx: commands.Context) -> None:
+        if ctx.command is None:
+            return
+        ctx._perf = (f"prefix:{ctx.command.qualified_name}", time.perf_counter(), False)
+        send = ctx.send
+
+        async def timed_send(*args: Any, **kwargs: Any) -> Any:
+            self.context_responded(ctx)
+            return await send(*args, **kwargs)
+
+        # Context.reply and friends go through self.send, so this sees them too
+        ctx.send = timed_send
+
+    def context_responded(self, ctx: commands.Context) -> None:
+        perf = getattr(ctx, "_perf", None)
+        if perf is None or perf[2]:
+            return
+        key, start, _ = perf
+        ctx._perf = (key, start, True)
+        self.stats(key).first_response.record(time.perf_counter() - start)
+
+    def finish_context(self, ctx: commands.Context) -> None:
+        perf = getattr(ctx, "_perf", None)
+        if perf is None:
+            return
+        key, start, _ = perf
+        ctx._perf = None
+        self.stats(key).completion.record(time.perf_counter() - start)
+
+    def begin_interaction(self, interaction: discord.Interaction) -> None:
+        if interaction.type == discord.InteractionType.application_command:
+            key = f"slash:{(interaction.data or {}).get('name', 'unknown')}"
+        elif interaction.type in (discord.InteractionType.component, discord.InteractionType.modal_submit):
+            key = _component_key(interaction)
+        else:
+            return
+        if not self._response_hook:
+            # Without the response hook only slash completion can be measured
+            if not key.startswith("slash:"):
+                return
+        else:
+            try:
+                interaction._cs_response
+            except AttributeError:
+                # Interaction.response is a cached slot; fill it before anything reads it
+                interaction._cs_response = _TimedResponse(interaction, self.interaction_responded)
+            else:
+                return
+        self._pending[interaction.id] = (key, time.perf_counter(), False)
+
+    def interaction_responded(self, interaction: discord.Interaction) -> None:
+        pending = self._pending.get(interaction.id)
+        if pending is None or pending[2]:
+            return
+        key, start, _ = pending
+        self.stats(key).first_response.record(time.perf_counter() - start)
+        if key.startswith("slash:"):
+            self._pending[interaction.id] = (key, start, True)
+        else:
+            # Components have no completion event; their first response ends the span
+            del self._pending[interaction.id]
+
+    def finish_interaction(self, interaction: discord.Interaction) -> None:
+        pending = self._pending.pop(interaction.id, None)
+        if pending is None:
+            return
+        key, start, _ = pending
+        self.stats(key).completion.record(time.perf_counter() - start)
+
+    def prune(self) -> None:
+        """Drop interactions that never responded (tokens expire after 15 minutes)."""
+        now = time.perf_counter()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        cutoff = now - PENDING_TTL
+        stale = [i for i, (_, start, _) in self._pending.items() if start < cutoff]
+        for interaction_id in stale:
+            del self._pending[interaction_id]
+
+    # --- wiring ---
+
+    def install(self, bot: commands.Bot) -> None:
+        if self._installed:
+            return
+        self._installed = True
+
+        original_invoke = bot.invoke
+
+        async def invoke(ctx: commands.Context) -> None:
+            self.begin_context(ctx)
+            try:
+                await original_invoke(ctx)
+            finally:
+                # Bot.invoke reports command errors itself, so this covers both outcomes
+                self.finish_context(ctx)
+
+        bot.invoke = invoke
+
+        # The hooks below use discord.py internals (pinned in requirements.txt); if an upgrade
+        # renames one, that part of the timing is skipped instead of breaking startup
+        if not self._response_hook:
+            logger.warning("Interaction._cs_response not found; interaction first-response latency is not recorded")
+
+        tree = getattr(bot, "tree", None)
+        if hasattr(tree, "_call"):
+            original_call = tree._call
+
+            async def call(interaction: discord.Interaction) -> None:
+                # First thing the tree's invoker task runs, before checks and the callback
+                self.begin_interaction(interaction)
+                try:
+                    await original_call(interaction)
+                finally:
+                    self.finish_interaction(interaction)
+
+            tree._call = call
+        else:
+            logger.warning("CommandTree._call not found; slash command latency is not recorded")
+
+        # Components and modals are dispatched synchronously while the gateway event is parsed
+        store = getattr(getattr(bot, "_connection", None), "_view_store", None)
+        for name in ("dispatch_view", "dispatch_modal"):
+            if self._response_hook and hasattr(store, name):
+                setattr(store, name, self._wrap_dispatch(getattr(store, name)))
+            elif self._response_hook:
+                logger.warning("ViewStore.%s not found; its interactions are not timed", name)
+
+        self.lag.on_sample = self.prune
+
+    def _wrap_dispatch(self, original: Callable[..., None]) -> Callable[..., None]:
+        def dispatch(*args: Any, **kwargs: Any) -> None:
+            for arg in (*args, *kwargs.values()):
+                if isinstance(arg, discord.Interaction):
+                    self.begin_interaction(arg)
+                    break
+            original(*args, **kwargs)
+
+        return dispatch
+
+    async def start(self) -> None:
+        self.lag.start()
+
+    # --- reporting ---
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "commands": {
+                key: {
+                    "first_response": stats.first_response.summary(),
+                    "completion": stats.completion.summary(),
+                }
+                for key, stats in sorted(self.commands.items())
+            },
+            "event_loop_lag": {**self.lag.histogram.summary(), "last_ms": round(self.lag.last * 1000, 3)},
+        }
+
+
+INSTRUMENTATION: Instrumentation = Instrumentation()
@@ -1,22 +1,86 @@
-import collections
 import logging
-from collections import deque
+import threading
+from datetime import datetime
 from typing import Any, Optional
 
+from utils.event_hub import EVENT_HUB
+
 LOG_BUFFER_MAX: int = 500
-LOG_BUFFER: deque[str] = collections.deque(maxlen=LOG_BUFFER_MAX)
+
+
+class LogRingBuffer:
+    """Fixed-size store of structured log records with monotonically increasing sequence numbers.
+
+    Sequence numbers are contiguous, so the slot for any retained record is
+    computed directly and ``since()`` costs O(new records) rather than a scan.
+    """
+
+    def __init__(self, capacity: int = LOG_BUFFER_MAX) -> None:
+        self.capacity: int = capacity
+        self._slots: list[Optional[dict[str, Any]]] = [None] * capacity
+        self._last_seq: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def first_seq(self) -> int:
+        return max(1, self._last_seq - self.capacity + 1)
+
+    def __len__(self) -> int:
+        return min(self._last_seq, self.capacity)
+
+    def append(self, record: dict[str, Any]) -> int:
+        with self._lock:
+            self._last_seq += 1
+            seq = self._last_seq
+            record["seq"] = seq
+            self._slots[seq % self.capacity] = record
+        return seq
+
+    def since(self, after: int = 0, limit: Optional[int] = None) -> tuple[list[dict[str, Any]], bool]:
+        """Return records with ``seq > after`` (oldest first) and whether some were already evicted."""
+        with self._lock:
+            last = self._last_seq
+            first = max(1, last - self.capacity + 1)
+            start = max(after + 1, first)
+            end = last if limit is None else min(last, start + limit - 1)
+            records = [self._slots[seq % self.capacity] for seq in range(start, end + 1)]
+        return records, after + 1 < first
+
+
+LOG_BUFFER: LogRingBuffer = LogRingBuffer(LOG_BUFFER_MAX)
+
+
+def _context(record: logging.LogRecord, name: str) -> Optional[str]:
+    value = getattr(record, name, None)
+    return str(value) if value is not None else None
 
 
 class BufferHandler(logging.Handler):
-    def __init__(self, fmt: Optional[logging.Formatter] = None) -> None:
+    def __init__(self, fmt: Optional[logging.Formatter] = None, buffer: LogRingBuffer = LOG_BUFFER) -> None:
         super().__init__()
         if fmt is None:
             fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
         self.setFormatter(fmt)
+        self.buffer = buffer
 
     def emit(self, record: logging.LogRecord) -> None:
         try:
-            msg = self.format(record)
-            LOG_BUFFER.append(msg)
+            entry = {
+                "time": datetime.fromtimestamp(record.created).isoformat(timespec="seconds"),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "text": self.format(record),
+                "user": _context(record, "user"),
+                "command": _context(record, "command"),
+                "channel": _context(record, "channel"),
+                "guild": _context(record, "guild"),
+            }
+            self.buffer.append(entry)
+            EVENT_HUB.publish("log", entry)
         except Exception:
             self.handleError(record)
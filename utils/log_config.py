@@ -0,0 +1,193 @@
+"""Runtime log level configuration for handlers and per-module loggers.
+
+Levels come from the ``LOG_LEVEL``/``LOG_LEVELS`` environment variables at
+startup and from ``config/log_levels.json`` whenever that file changes:
+
+    {"level": "INFO", "handlers": {"console": "INFO", "file": "DEBUG"}, "modules": {"work": "VERBOSE"}}
+
+Handler names are ``console``, ``file``, ``buffer`` and ``discord``; any other
+target is a module logger under the base logger (``work`` -> ``entrophy.work``).
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Optional
+
+from utils.log_query import level_number
+
+LOG_LEVELS_FILE: str = "config/log_levels.json"
+BASE_TARGETS: tuple[str, ...] = ("base", "logger")
+DEFAULT_LEVEL: str = "INFO"
+
+
+def parse_spec(spec: str) -> dict[str, str]:
+    """Parse ``console=INFO,work=VERBOSE`` into a target -> level mapping."""
+    result: dict[str, str] = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        target, level = part.split("=", 1)
+        if target.strip() and level.strip():
+            result[target.strip()] = level.strip()
+    return result
+
+
+class LevelManager:
+    """Applies level changes to a logger's handlers and module loggers.
+
+    The base logger level is never below the lowest handler level, so records
+    no handler would emit are rejected by the cached ``isEnabledFor`` check
+    before a ``LogRecord`` is built. Module overrides bypass the base level
+    for that module only.
+    """
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self.logger = logger
+        self.base_level: int = level_number(DEFAULT_LEVEL)
+        self._modules: dict[str, int] = {}
+        # Level each handler had before its first runtime change, for reset()
+        self._handler_defaults: dict[str, int] = {}
+
+    def handler(self, name: str) -> Optional[logging.Handler]:
+        for h in self.logger.handlers:
+            if h.get_name() == name:
+                return h
+        return None
+
+    def module_logger_name(self, name: str) -> str:
+        if name != self.logger.name and not name.startswith(self.logger.name + "."):
+            name = f"{self.logger.name}.{name}"
+        return name
+
+    def set_level(self, target: str, level: str, existing_only: bool = False) -> str:
+        """Set ``target`` to ``level`` and return a short description. Raises ``ValueError``.
+
+        With ``existing_only`` a module target must name a logger that already
+        exists, so a typo is reported instead of creating a new logger.
+        """
+        levelno = level_number(level)
+        target = target.strip()
+        if target.lower() in BASE_TARGETS or target == self.logger.name:
+            self.base_level = levelno
+            desc = f"logger {self.logger.name}"
+        else:
+            handler = self.handler(target.lower())
+            if handler is not None:
+                self._handler_defaults.setdefault(handler.get_name(), handler.level)
+                handler.setLevel(levelno)
+                desc = f"handler {handler.get_name()}"
+            else:
+                name = self.module_logger_name(target)
+                if existing_only and name not in logging.Logger.manager.loggerDict:
+                    raise ValueError(f"Unknown handler or logger: {target}")
+                module = logging.getLogger(name)
+                module.setLevel(levelno)
+                self._modules[module.name] = levelno
+                desc = f"logger {module.name}"
+        self.sync()
+        return f"{desc} -> {logging.getLevelName(levelno)}"
+
+    def reset_modules(self) -> None:
+        for name in self._modules:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        self._modules.clear()
+
+    def reset(self) -> None:
+        """Drop every runtime change: module overrides, handler levels and the base level."""
+        self.reset_modules()
+        for h in self.logger.handlers:
+            default = self._handler_defaults.pop(h.get_name(), None)
+            if default is not None:
+                h.setLevel(default)
+        self.apply_env()
+
+    def sync(self) -> None:
+        """Recompute the base logger level from the requested level and the handlers."""
+        floor = min((h.level for h in self.logger.handlers), default=logging.NOTSET)
+        self.logger.setLevel(max(self.base_level, floor))
+
+    def apply(self, config: dict[str, Any]) -> list[str]:
+        """Apply a full config dict (see module docstring); invalid levels or shapes raise ``ValueError``."""
+        if not isinstance(config, dict):
+            raise ValueError("expected a JSON object")
+        for section in ("handlers", "modules"):
+            if not isinstance(config.get(section, {}), dict):
+                raise ValueError(f'"{section}" must be an object of name -> level')
+        changes: list[str] = []
+        self.reset_modules()
+        self.base_level = level_number(config.get("level") or os.getenv("LOG_LEVEL", DEFAULT_LEVEL))
+        for name, level in config.get("handlers", {}).items():
+            if self.handler(name) is None:
+                continue
+            changes.append(self.set_level(name, level))
+        for name, level in config.get("modules", {}).items():
+            changes.append(self.set_level(name, level))
+        self.sync()
+        changes.insert(0, f"logger {self.logger.name} -> {logging.getLevelName(self.base_level)}")
+        return changes
+
+    def apply_env(self) -> None:
+        self.base_level = level_number(os.getenv("LOG_LEVEL", DEFAULT_LEVEL))
+        for target, value in parse_spec(os.getenv("LOG_LEVELS", "")).items():
+            self.set_level(target, value)
+        self.sync()
+
+    def describe(self) -> dict[str, str]:
+        levels = {f"logger {self.logger.name}": logging.getLevelName(self.logger.level)}
+        for h in self.logger.handlers:
+            levels[f"handler {h.get_name() or type(h).__name__}"] = logging.getLevelName(h.level)
+        for name, levelno in self._modules.items():
+            levels[f"logger {name}"] = logging.getLevelName(levelno)
+        return levels
+
+
+class LevelFileWatcher:
+    """Polls ``LOG_LEVELS_FILE`` for mtime changes and re-applies it.
+
+    Start it from an async context with ``await watcher.start()``.
+    """
+
+    def __init__(self, manager: LevelManager, path: str = LOG_LEVELS_FILE, interval: float = 5.0) -> None:
+        self.manager = manager
+        self.path = path
+        self.interval = interval
+        self._mtime: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self.check()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def check(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            changes = self.manager.apply(config)
+        except (OSError, ValueError) as e:
+            self.manager.logger.warning(f"Ignoring invalid {self.path}: {e}")
+            return False
+        self.manager.logger.info(f"Log levels reloaded from {self.path}: {', '.join(changes) or 'defaults'}")
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                # Keep watching; a later edit may fix whatever broke this one
+                self.manager.logger.exception(f"Failed to reload {self.path}")
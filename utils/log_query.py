@@ -0,0 +1,268 @@
+"""Tail and filtered queries over the rotating log files.
+
+Each log file gets a small ``.idx`` sidecar describing fixed-size chunks of
+the file (byte range, first/last timestamp, highest level, guilds seen), so a
+query only reads the chunks that can match instead of scanning whole files.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Optional
+
+INDEX_SUFFIX: str = ".idx"
+INDEX_VERSION: int = 1
+CHUNK_BYTES: int = 64 * 1024
+HEAD_BYTES: int = 128
+TAIL_BLOCK: int = 8192
+
+RECORD_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] \S+\s*\[(\w+)\] ")
+GUILD_SEP: str = " | Guild: "
+
+_index_lock = threading.Lock()
+
+
+def tail_lines(path: str, count: int = 10, block_size: int = TAIL_BLOCK) -> list[str]:
+    """Return the last ``count`` lines of ``path`` by reading blocks from the end."""
+    if count <= 0 or not os.path.exists(path):
+        return []
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # One extra newline is needed so the first returned line is complete
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+
+    lines = data.decode("utf-8", errors="ignore").splitlines()
+    return lines[-count:]
+
+
+def level_number(name: str) -> int:
+    """Resolve a level name (``INFO``, ``verbose``...) or number to its numeric value."""
+    if name.isdigit():
+        return int(name)
+    value = logging.getLevelName(name.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {name}")
+    return value
+
+
+def normalize_time(value: str) -> str:
+    """Turn an epoch or ISO timestamp into the ``YYYY-MM-DD HH:MM:SS`` form used in the logs."""
+    value = value.strip()
+    try:
+        dt = datetime.fromtimestamp(float(value))
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"Timestamp out of range: {value}") from e
+    except ValueError:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if dt.tzinfo is not None:
+            # Log lines are stamped in the process's local time, like fromtimestamp() above
+            dt = dt.astimezone().replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def log_files(path: str, backups: int = 5) -> list[str]:
+    """The active log file followed by its rotated backups, newest first."""
+    candidates = [path] + [f"{path}.{i}" for i in range(1, backups + 1)]
+    return [p for p in candidates if os.path.exists(p)]
+
+
+def _head_digest(f: Any, length: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(length)).hexdigest()
+
+
+def _parse_guild(line: str) -> Optional[str]:
+    idx = line.rfind(GUILD_SEP)
+    if idx == -1:
+        return None
+    return line[idx + len(GUILD_SEP):].strip() or None
+
+
+def _new_chunk(start: int) -> dict[str, Any]:
+    return {"start": start, "end": start, "first": None, "last": None, "max_level": 0, "guilds": []}
+
+
+def _scan(f: Any, start: int, size: int) -> list[dict[str, Any]]:
+    """Index ``f`` from ``start`` up to the last complete line before ``size``."""
+    chunks: list[dict[str, Any]] = []
+    chunk = _new_chunk(start)
+    f.seek(start)
+    offset = start
+    while offset < size:
+        raw = f.readline()
+        if not raw or not raw.endswith(b"\n"):
+            break
+        line = raw.decode("utf-8", errors="ignore")
+        match = RECORD_RE.match(line)
+        if match:
+            # Only split on a record boundary so tracebacks stay with their record
+            if chunk["end"] - chunk["start"] >= CHUNK_BYTES:
+                chunks.append(chunk)
+                chunk = _new_chunk(offset)
+            ts, level = match.group(1), match.group(2)
+            if chunk["first"] is None:
+                chunk["first"] = ts
+            chunk["last"] = ts
+            levelno = logging.getLevelName(level)
+            if isinstance(levelno, int) and levelno > chunk["max_level"]:
+                chunk["max_level"] = levelno
+            guild = _parse_guild(line.rstrip("\n"))
+            if guild and guild not in chunk["guilds"]:
+                chunk["guilds"].append(guild)
+        offset += len(raw)
+        chunk["end"] = offset
+    if chunk["end"] > chunk["start"]:
+        chunks.append(chunk)
+    return chunks
+
+
+def load_index(path: str) -> list[dict[str, Any]]:
+    """Return the chunk index for ``path``, building or extending its sidecar as needed."""
+    idx_path = path + INDEX_SUFFIX
+    with _index_lock, open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+
+        index: Optional[dict[str, Any]] = None
+        try:
+            with open(idx_path, "r", encoding="utf-8") as fi:
+                index = json.load(fi)
+        except (OSError, ValueError):
+            index = None
+
+        if index is not None:
+            head_len = index.get("head_len", 0)
+            if (
+                index.get("version") != INDEX_VERSION
+                or size < index.get("size", 0)
+                or _head_digest(f, head_len) != index.get("head")
+            ):
+                # Rotated or truncated underneath us
+                index = None
+
+        if index is not None and index["size"] == size:
+            return index["chunks"]
+
+        if index is None:
+            chunks: list[dict[str, Any]] = []
+            resume = 0
+        else:
+            chunks = index["chunks"]
+            # The last chunk may still be growing; re-scan it together with the new data
+            resume = chunks.pop()["start"] if chunks else 0
+
+        chunks.extend(_scan(f, resume, size))
+        indexed = chunks[-1]["end"] if chunks else 0
+        head_len = min(HEAD_BYTES, indexed)
+        index = {
+            "version": INDEX_VERSION,
+            "size": indexed,
+            "head_len": head_len,
+            "head": _head_digest(f, head_len),
+            "chunks": chunks,
+        }
+
+    tmp_path = idx_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as fo:
+            json.dump(index, fo, separators=(",", ":"))
+        os.replace(tmp_path, idx_path)
+    except OSError:
+        pass
+    return index["chunks"]
+
+
+def _chunk_matches(
+    chunk: dict[str, Any],
+    min_level: Optional[int],
+    since: Optional[str],
+    until: Optional[str],
+    guild: Optional[str],
+) -> bool:
+    if chunk["first"] is None:
+        return False
+    if min_level is not None and chunk["max_level"] < min_level:
+        return False
+    if since is not None and chunk["last"] < since:
+        return False
+    if until is not None and chunk["first"] > until:
+        return False
+    if guild is not None and not any(guild in g.lower() for g in chunk["guilds"]):
+        return False
+    return True
+
+
+def _read_records(f: Any, chunk: dict[str, Any], source: str) -> list[dict[str, Any]]:
+    f.seek(chunk["start"])
+    text = f.read(chunk["end"] - chunk["start"]).decode("utf-8", errors="ignore")
+    records: list[dict[str, Any]] = []
+    for line in text.splitlines():
+        match = RECORD_RE.match(line)
+        if match:
+            levelno = logging.getLevelName(match.group(2))
+            records.append({
+                "time": match.group(1),
+                "level": match.group(2),
+                "levelno": levelno if isinstance(levelno, int) else 0,
+                "guild": _parse_guild(line),
+                "message": line,
+                "file": source,
+            })
+        elif records:
+            records[-1]["message"] += "\n" + line
+    return records
+
+
+def query_logs(
+    path: str,
+    level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    guild: Optional[str] = None,
+    limit: int = 100,
+    backups: int = 5,
+) -> list[dict[str, Any]]:
+    """Return up to ``limit`` matching records across ``path`` and its backups, newest first.
+
+    ``level`` is a minimum level, ``since``/``until`` accept epoch or ISO
+    timestamps and ``guild`` is a case-insensitive substring of the guild name.
+    Raises ``ValueError`` for malformed filters.
+    """
+    min_level = level_number(level) if level else None
+    since_ts = normalize_time(since) if since else None
+    until_ts = normalize_time(until) if until else None
+    guild_key = guild.lower() if guild else None
+
+    results: list[dict[str, Any]] = []
+    for file_path in log_files(path, backups):
+        try:
+            chunks = load_index(file_path)
+        except OSError:
+            continue
+        source = os.path.basename(file_path)
+        with open(file_path, "rb") as f:
+            for chunk in reversed(chunks):
+                if not _chunk_matches(chunk, min_level, since_ts, until_ts, guild_key):
+                    continue
+                for record in reversed(_read_records(f, chunk, source)):
+                    if min_level is not None and record["levelno"] < min_level:
+                        continue
+                    if since_ts is not None and record["time"] < since_ts:
+                        continue
+                    if until_ts is not None and record["time"] > until_ts:
+                        continue
+                    if guild_key is not None and guild_key not in (record["guild"] or "").lower():
+                        continue
+                    results.append(record)
+                    if len(results) >= limit:
+                        return results
+    return results
@@ -0,0 +1,100 @@
+"""Single ``on_message`` pipeline for the bot.
+
+Every message goes through the same steps once: drop bot authors, resolve
+the command context, invoke the command if there is one, and otherwise hand
+the message to the handlers registered for its channel plus the global ones.
+Handler tables are rebuilt when registrations change, so a channel nobody
+listens to costs one dict lookup.
+
+Handlers are ``async def handler(message, ctx)``; cogs register them in
+``cog_load`` and drop them in ``cog_unload``:
+
+    self.bot.router.set_channels("ai", channel_ids, self.handle_ai_message)
+    self.bot.router.add_global("thai_autocorrect", self.handle_autocorrect)
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Iterable
+
+import discord
+from discord.ext import commands
+
+MessageHandler = Callable[[discord.Message, commands.Context], Awaitable[None]]
+
+logger = logging.getLogger("entrophy.router")
+
+
+class MessageRouter:
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        self._channels: dict[str, dict[int, MessageHandler]] = {}
+        self._globals: dict[str, MessageHandler] = {}
+        self._tables: dict[int, tuple[MessageHandler, ...]] = {}
+        self._global_table: tuple[MessageHandler, ...] = ()
+
+    # --- registration ---
+
+    def set_channels(self, name: str, channel_ids: Iterable[int], handler: MessageHandler) -> None:
+        """Route messages from ``channel_ids`` to ``handler``, replacing ``name``'s previous channels."""
+        self._channels[name] = {int(cid): handler for cid in channel_ids}
+        self._rebuild()
+
+    def add_channel(self, name: str, channel_id: int, handler: MessageHandler) -> None:
+        self._channels.setdefault(name, {})[int(channel_id)] = handler
+        self._rebuild()
+
+    def remove_channel(self, name: str, channel_id: int) -> None:
+        if self._channels.get(name, {}).pop(int(channel_id), None) is not None:
+            self._rebuild()
+
+    def add_global(self, name: str, handler: MessageHandler) -> None:
+        """Run ``handler`` for every non-command message in every channel."""
+        self._globals[name] = handler
+        self._rebuild()
+
+    def remove(self, name: str) -> None:
+        """Drop every registration made under ``name``."""
+        self._channels.pop(name, None)
+        self._globals.pop(name, None)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._global_table = tuple(self._globals.values())
+        tables: dict[int, list[MessageHandler]] = {}
+        for handlers in self._channels.values():
+            for channel_id, handler in handlers.items():
+                tables.setdefault(channel_id, []).append(handler)
+        self._tables = {cid: tuple(hs) + self._global_table for cid, hs in tables.items()}
+
+    def handlers_for(self, channel_id: int) -> tuple[MessageHandler, ...]:
+        return self._tables.get(channel_id, self._global_table)
+
+    # --- dispatch ---
+
+    async def dispatch(self, message: discord.Message) -> None:
+        if message.author.bot:
+            return
+
+        ctx = await self.bot.get_context(message)
+        if ctx.valid:
+            # Command messages are never fed to channel handlers (AI replies, TTS, autocorrect)
+            await self.bot.invoke(ctx)
+            return
+        if ctx.invoked_with:
+            # Prefix without a known command: report CommandNotFound like process_commands, then carry on
+            await self.bot.invoke(ctx)
+
+        handlers = self.handlers_for(message.channel.id)
+        if not handlers:
+            return
+        if len(handlers) == 1:
+            await self._run(handlers[0], message, ctx)
+            return
+        # Independent features; a slow AI reply must not hold up TTS or autocorrect
+        await asyncio.gather(*(self._run(handler, message, ctx) for handler in handlers))
+
+    async def _run(self, handler: MessageHandler, message: discord.Message, ctx: commands.Context) -> None:
+        try:
+            await handler(message, ctx)
+        except Exception:
+            logger.exception(f"Message handler {getattr(handler, '__qualname__', handler)} failed")
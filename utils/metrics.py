@@ -0,0 +1,289 @@
+"""Prometheus text-format metrics for the keep_alive ``/metrics`` endpoint.
+
+Counters and histograms are plain in-process objects updated from the bot
+loop; gauges are callbacks evaluated at scrape time. Rendering is cached for
+a second so frequent scrapes cost a bytes copy.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Union
+
+from utils.event_hub import EVENT_HUB
+from utils.instrumentation import INSTRUMENTATION, LatencyHistogram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+INF_LABEL: str = 'le="+Inf"'
+LabelKey = tuple[str, ...]
+GaugeValue = Union[float, dict[LabelKey, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: LabelKey, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self.values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    """Latency histogram exported with fixed ``le`` buckets over a ``LatencyHistogram``."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self.buckets = list(buckets)
+        self.values: dict[LabelKey, LatencyHistogram] = {}
+
+    def labels(self, **labels: str) -> LatencyHistogram:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        hist = self.values.get(key)
+        if hist is None:
+            hist = self.values[key] = LatencyHistogram()
+        return hist
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        self.labels(**labels).record(seconds)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, hist in sorted(self.values.items()):
+            lines.extend(render_histogram(self.name, self.label_names, key, hist, self.buckets))
+        return lines
+
+
+def render_histogram(
+    name: str,
+    label_names: tuple[str, ...],
+    key: LabelKey,
+    hist: LatencyHistogram,
+    buckets: list[float],
+) -> list[str]:
+    count, total = hist.count, hist.total
+    lines = []
+    for bound, seen in zip(buckets, hist.cumulative(buckets)):
+        le = 'le="%s"' % _fmt(bound)
+        lines.append(f"{name}_bucket{_labels(label_names, key, le)} {seen}")
+    lines.append(f"{name}_bucket{_labels(label_names, key, INF_LABEL)} {count}")
+    lines.append(f"{name}_sum{_labels(label_names, key)} {_fmt(round(total, 6))}")
+    lines.append(f"{name}_count{_labels(label_names, key)} {count}")
+    return lines
+
+
+class Gauge:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], GaugeValue],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.label_names = labels
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if isinstance(value, dict):
+            for key, v in sorted(value.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, key)} {_fmt(v)}")
+        else:
+            lines.append(f"{self.name} {_fmt(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self, cache_seconds: float = 1.0) -> None:
+        self.metrics: dict[str, Any] = {}
+        self.cache_seconds = cache_seconds
+        self._cached: Optional[bytes] = None
+        self._cached_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], GaugeValue], labels: tuple[str, ...] = (), kind: str = "gauge") -> Gauge:
+        """Register (or replace) a callback gauge evaluated at scrape time."""
+        gauge = Gauge(name, help_text, fn, labels, kind)
+        self.metrics[name] = gauge
+        return gauge
+
+    def unregister(self, name: str) -> None:
+        self.metrics.pop(name, None)
+
+    def render(self) -> bytes:
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is not None and now - self._cached_at < self.cache_seconds:
+                return self._cached
+            lines: list[str] = []
+            for metric in list(self.metrics.values()):
+                lines.extend(metric.render())
+            lines.extend(_instrumentation_lines())
+            self._cached = ("\n".join(lines) + "\n").encode("utf-8")
+            self._cached_at = now
+            return self._cached
+
+
+def _instrumentation_lines() -> list[str]:
+    buckets = list(DEFAULT_BUCKETS)
+    name = "entrophy_command_duration_seconds"
+    lines = [
+        f"# HELP {name} Time from receiving a command or interaction to its first response / completion",
+        f"# TYPE {name} histogram",
+    ]
+    for key, stats in sorted(INSTRUMENTATION.commands.items()):
+        kind, _, command = key.partition(":")
+        for phase, hist in (("first_response", stats.first_response), ("completion", stats.completion)):
+            if hist.count:
+                lines.extend(render_histogram(name, ("type", "command", "phase"), (kind, command, phase), hist, buckets))
+
+    name = "entrophy_event_loop_lag_seconds"
+    lines.append(f"# HELP {name} How late the event loop wakes a sleeping task")
+    lines.append(f"# TYPE {name} histogram")
+    lines.extend(render_histogram(name, (), (), INSTRUMENTATION.lag.histogram, buckets))
+    return lines
+
+
+def process_rss_bytes() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return float(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS; better than nothing
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    return None
+
+
+def process_cpu_seconds() -> Optional[float]:
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime + usage.ru_stime
+    return time.process_time()
+
+
+REGISTRY: Registry = Registry()
+
+COMMANDS_TOTAL = REGISTRY.counter("entrophy_commands_total", "Commands executed", ("type", "command"))
+COMMAND_ERRORS_TOTAL = REGISTRY.counter("entrophy_command_errors_total", "Command errors by exception type", ("type",))
+AI_REQUEST_DURATION = REGISTRY.histogram("entrophy_ai_request_duration_seconds", "Gemini generate_content call duration", ("kind",))
+QR_RENDER_DURATION = REGISTRY.histogram("entrophy_qr_render_duration_seconds", "PromptPay QR image render duration")
+STORAGE_FLUSH_DURATION = REGISTRY.histogram("entrophy_storage_flush_duration_seconds", "JSON storage write duration", ("store",))
+THAI_CORRECTIONS_TOTAL = REGISTRY.counter("entrophy_thai_corrections_total", "Thai autocorrect corrections by outcome", ("outcome",))
+PURGED_MESSAGES_TOTAL = REGISTRY.counter("entrophy_purged_messages_total", "Messages deleted by channel purges by method", ("method",))
+
+_queue_depths: dict[str, Callable[[], int]] = {}
+
+
+def register_queue(name: str, fn: Callable[[], int]) -> None:
+    """Expose ``fn()`` as ``entrophy_queue_depth{queue=name}``."""
+    _queue_depths[name] = fn
+
+
+def unregister_queue(name: str) -> None:
+    _queue_depths.pop(name, None)
+
+
+def queue_depths() -> dict[str, int]:
+    depths: dict[str, int] = {}
+    for name, fn in list(_queue_depths.items()):
+        try:
+            depths[name] = int(fn())
+        except Exception:
+            continue
+    return depths
+
+
+def _queue_values() -> dict[LabelKey, float]:
+    return {(name,): float(depth) for name, depth in queue_depths().items()}
+
+
+REGISTRY.gauge("entrophy_queue_depth", "Items waiting in internal queues", _queue_values, ("queue",))
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes", process_rss_bytes)
+REGISTRY.gauge("process_cpu_seconds_total", "Total user and system CPU time spent in seconds", process_cpu_seconds, kind="counter")
+REGISTRY.gauge("entrophy_event_stream_clients", "Connected /events dashboard streams", lambda: EVENT_HUB.subscriber_count)
+REGISTRY.gauge("entrophy_event_stream_disconnects_total", "Event streams dropped for falling behind", lambda: EVENT_HUB.disconnected, kind="counter")
+register_queue("pending_interactions", lambda: INSTRUMENTATION.pending_count)
+
+
+def register_bot(bot: Any) -> None:
+    """Register gauges that read live bot state."""
+    REGISTRY.gauge(
+        "entrophy_gateway_latency_seconds",
+        "Discord gateway heartbeat latency",
+        lambda: bot.latency if bot.latency == bot.latency else None,
+    )
+    REGISTRY.gauge("entrophy_guilds", "Guilds the bot is in", lambda: len(bot.guilds))
+    REGISTRY.gauge("entrophy_gateway_connected", "1 when the gateway websocket is open", lambda: 0 if bot.is_closed() or not bot.is_ready() else 1)
+    launch = getattr(bot, "launch_time", None)
+    if launch is not None:
+        REGISTRY.gauge("process_start_time_seconds", "Start time of the process since unix epoch in seconds", lambda: launch.timestamp())
@@ -0,0 +1,221 @@
+"""Character trigram language model: is this text English, or Thai typed on the wrong layout?
+
+The model file holds, per language, two hashed float32 tables: log P(c | ab)
+for trigrams seen in training, and the smoothed log-probability of an unseen
+character after each bigram context. The file is memory-mapped and read
+through ``memoryview.cast('f')``, so loading costs nothing up front and
+scoring is a few table lookups per character.
+
+Build it from the corpora in ``models/corpus``:
+
+    python -m utils.ngram_model build
+    python -m utils.ngram_model score "l;ylfu8iy["
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from typing import Iterable, Optional
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE: str = os.path.join(ROOT, "models", "lang_ngram.bin")
+CORPUS_DIR: str = os.path.join(ROOT, "models", "corpus")
+
+MAGIC: bytes = b"ENGM"
+VERSION: int = 1
+HEADER = struct.Struct("<4sIIf")  # magic, version, table bits, decision threshold
+DEFAULT_BITS: int = 14
+SMOOTHING: float = 0.1
+VOCAB_SIZE: int = 128
+LANGS: tuple[str, ...] = ("en", "th")
+
+K1, K2, K3 = 0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D
+
+
+def _codes(text: str) -> list[int]:
+    """Lowercased code points with whitespace collapsed and padded by a space on each side."""
+    return [32, *map(ord, " ".join(text.lower().split())), 32]
+
+
+def _context_bucket(a: int, b: int, mask: int) -> int:
+    return (a * K1 ^ b * K2) & mask
+
+
+def _trigram_bucket(a: int, b: int, c: int, mask: int) -> int:
+    return (a * K1 ^ b * K2 ^ c * K3) & mask
+
+
+class NgramModel:
+    def __init__(self, path: str = MODEL_FILE) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, bits, threshold = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} n-gram model")
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.threshold = threshold
+
+        size = 1 << bits
+        if len(self._mm) != HEADER.size + 16 * size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        self._floats = memoryview(self._mm)[HEADER.size:].cast("f")
+        # en trigrams, en contexts, th trigrams, th contexts
+        self._tables = {
+            lang: (self._floats[i * 2 * size:(i * 2 + 1) * size], self._floats[(i * 2 + 1) * size:(i * 2 + 2) * size])
+            for i, lang in enumerate(LANGS)
+        }
+
+    def close(self) -> None:
+        for views in self._tables.values():
+            for view in views:
+                view.release()
+        self._floats.release()
+        self._mm.close()
+
+    def score(self, text: str, lang: str) -> float:
+        """Mean log-probability per character of ``text`` under ``lang``."""
+        trigrams, contexts = self._tables[lang]
+        mask = self.mask
+        codes = _codes(text)
+        total = 0.0
+        for a, b, c in zip(codes, codes[1:], codes[2:]):
+            hc = a * K1 ^ b * K2
+            value = trigrams[(hc ^ c * K3) & mask]
+            total += value if value else contexts[hc & mask]
+        return total / max(len(codes) - 2, 1)
+
+    def thai_margin(self, raw: str, converted: str) -> float:
+        """How much more likely ``converted`` is as Thai than ``raw`` is as English."""
+        return self.score(converted, "th") - self.score(raw, "en")
+
+    def is_mistyped(self, raw: str, converted: str) -> bool:
+        return self.thai_margin(raw, converted) > self.threshold
+
+
+_model: Optional[NgramModel] = None
+_model_loaded: bool = False
+
+
+def load_model(path: str = MODEL_FILE) -> Optional[NgramModel]:
+    """The shared model, mapped on first use; None when the file is missing or invalid."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        try:
+            _model = NgramModel(path)
+        except (OSError, ValueError):
+            _model = None
+    return _model
+
+
+# --- building ---
+
+def _tables(lines: Iterable[str], bits: int) -> tuple[array, array]:
+    size = 1 << bits
+    mask = size - 1
+    trigram_counts: Counter = Counter()
+    context_counts: Counter = Counter()
+    for line in lines:
+        codes = _codes(line)
+        for a, b, c in zip(codes, codes[1:], codes[2:]):
+            trigram_counts[(a, b, c)] += 1
+            context_counts[(a, b)] += 1
+
+    trigrams = array("f", bytes(4 * size))
+    contexts = array("f", [math.log(1.0 / VOCAB_SIZE)]) * size
+    for (a, b), n in context_counts.items():
+        contexts[_context_bucket(a, b, mask)] = math.log(SMOOTHING / (n + SMOOTHING * VOCAB_SIZE))
+    for (a, b, c), n in trigram_counts.items():
+        logp = math.log((n + SMOOTHING) / (context_counts[(a, b)] + SMOOTHING * VOCAB_SIZE))
+        bucket = _trigram_bucket(a, b, c, mask)
+        # On a collision keep the likelier trigram; 0.0 is reserved for "empty"
+        current = trigrams[bucket]
+        trigrams[bucket] = max(current, logp) if current else logp
+    return trigrams, contexts
+
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _best_threshold(positives: list[float], negatives: list[float]) -> float:
+    """Margin cut-off with the best F1 on the training data (positives = mistyped Thai)."""
+    best, best_f1 = 0.0, -1.0
+    margins = sorted(set(positives + negatives))
+    # Cut halfway between neighbouring margins rather than right on a training example
+    for cut in ((lo + hi) / 2 for lo, hi in zip(margins, margins[1:])):
+        tp = sum(1 for m in positives if m > cut)
+        fp = sum(1 for m in negatives if m > cut)
+        if tp == 0:
+            continue
+        precision = tp / (tp + fp)
+        recall = tp / len(positives)
+        f1 = 2 * precision * recall / (precision + recall)
+        if f1 > best_f1:
+            best, best_f1 = cut, f1
+    return best
+
+
+def build_model(english: list[str], thai: list[str], path: str = MODEL_FILE, bits: int = DEFAULT_BITS) -> float:
+    """Train on the two corpora, write ``path`` and return the chosen threshold."""
+    from utils.thai_layout import convert_to_thai, thai_to_qwerty_text
+
+    en_tables = _tables(english, bits)
+    th_tables = _tables(thai, bits)
+    body = b"".join(t.tobytes() for t in (*en_tables, *th_tables))
+
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bits, 0.0))
+        f.write(body)
+    model = NgramModel(tmp)
+    # Thai lines typed on the US layout are the positives, English lines the negatives
+    positives = [model.thai_margin(q, convert_to_thai(q)) for q in map(thai_to_qwerty_text, thai)]
+    negatives = [model.thai_margin(line, convert_to_thai(line)) for line in english]
+    threshold = _best_threshold(positives, negatives)
+    model.close()
+
+    with open(tmp, "r+b") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bits, threshold))
+    os.replace(tmp, path)
+    return threshold
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m utils.ngram_model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="train from models/corpus and write the model file")
+    build.add_argument("--english", default=os.path.join(CORPUS_DIR, "en.txt"))
+    build.add_argument("--thai", default=os.path.join(CORPUS_DIR, "th.txt"))
+    build.add_argument("--out", default=MODEL_FILE)
+    build.add_argument("--bits", type=int, default=DEFAULT_BITS)
+    score = sub.add_parser("score", help="print the Thai-vs-English margin for some text")
+    score.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        threshold = build_model(_read_lines(args.english), _read_lines(args.thai), args.out, args.bits)
+        print(f"wrote {args.out} ({os.path.getsize(args.out):,} bytes, threshold {threshold:.3f})")
+    else:
+        from utils.thai_layout import convert_to_thai
+
+        model = load_model()
+        if model is None:
+            sys.exit(f"no model at {MODEL_FILE}; run `python -m utils.ngram_model build` first")
+        converted = convert_to_thai(args.text)
+        margin = model.thai_margin(args.text, converted)
+        print(f"{args.text!r} -> {converted!r}: margin {margin:.3f} (threshold {model.threshold:.3f}) mistyped={margin > model.threshold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Deletes a channel's recent messages in the background, with progress and cancel.
+
+Discord's bulk delete takes 2-100 messages per request but refuses anything
+older than 14 days; those have to go one request at a time on a much tighter
+rate limit. ``PurgeJob`` walks the history newest first, sends young messages
+in bulk batches of up to 100 and paces single deletes for the old ones, so a
+1000-message purge costs about ten requests instead of a thousand when the
+channel is active. ``check`` decides what may be deleted (the channel
+dashboard is kept this way), ``cancel()`` stops the job between requests, and
+``on_progress`` is called at most every ``progress_interval`` seconds.
+"""
+import datetime
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import discord
+
+from utils.metrics import PURGED_MESSAGES_TOTAL
+from utils.rate_limit import SendBucket
+
+logger = logging.getLogger("entrophy.purge")
+
+BULK_LIMIT: int = 100
+# Slightly under Discord's 14 days so a message does not age out mid-request
+BULK_MAX_AGE: datetime.timedelta = datetime.timedelta(days=14) - datetime.timedelta(minutes=2)
+SINGLE_DELETE_INTERVAL: float = 1.2
+PROGRESS_INTERVAL: float = 2.0
+
+Check = Callable[[discord.Message], bool]
+Progress = Callable[["PurgeJob"], Awaitable[None]]
+
+
+class PurgeJob:
+    __slots__ = (
+        "channel", "limit", "check", "deleted", "bulk_deleted", "single_deleted",
+        "failed", "cancelled", "finished", "error", "started", "_bucket",
+    )
+
+    def __init__(self, channel: Any, limit: int, check: Optional[Check] = None) -> None:
+        self.channel = channel
+        self.limit = limit
+        self.check = check
+        self.deleted = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        self.finished = False
+        self.error: Optional[str] = None
+        self.started = time.monotonic()
+        self._bucket = SendBucket(size=1, period=SINGLE_DELETE_INTERVAL)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    async def _bulk(self, batch: list[discord.Message]) -> None:
+        try:
+            if len(batch) == 1:
+                await batch[0].delete()
+            else:
+                await self.channel.delete_messages(batch)
+        except discord.NotFound:
+            # One of them was deleted by someone else first; retry the batch one by one
+            for message in batch:
+                await self._single(message)
+            return
+        self.deleted += len(batch)
+        self.bulk_deleted += len(batch)
+        PURGED_MESSAGES_TOTAL.inc(len(batch), method="bulk")
+
+    async def _single(self, message: discord.Message) -> None:
+        await self._bucket.acquire()
+        try:
+            await message.delete()
+        except discord.NotFound:
+            return
+        except discord.HTTPException as e:
+            if isinstance(e, discord.Forbidden):
+                raise
+            self.failed += 1
+            logger.debug("Could not delete message %s: %s", message.id, e)
+            return
+        self.deleted += 1
+        self.single_deleted += 1
+        PURGED_MESSAGES_TOTAL.inc(method="single")
+
+    async def run(self, on_progress: Optional[Progress] = None) -> "PurgeJob":
+        last_report = time.monotonic()
+
+        async def report(force: bool = False) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if on_progress is not None and (force or now - last_report >= PROGRESS_INTERVAL):
+                last_report = now
+                try:
+                    await on_progress(self)
+                except discord.HTTPException:
+                    # A lost progress edit is harmless, a lost final status is not
+                    logger.log(
+                        logging.WARNING if self.finished else logging.DEBUG,
+                        "Purge progress update failed in channel %s", self.channel.id, exc_info=True,
+                    )
+
+        cutoff = discord.utils.utcnow() - BULK_MAX_AGE
+        batch: list[discord.Message] = []
+        selected = 0
+        try:
+            async for message in self.channel.history(limit=None):
+                if self.cancelled:
+                    break
+                if self.check is not None and not self.check(message):
+                    continue
+                selected += 1
+                if message.created_at > cutoff:
+                    batch.append(message)
+                    if len(batch) == BULK_LIMIT:
+                        await self._bulk(batch)
+                        batch = []
+                        await report()
+                else:
+                    # History is newest first: flush the young ones before the slow path
+                    if batch:
+                        await self._bulk(batch)
+                        batch = []
+                    await self._single(message)
+                    await report()
+                if selected >= self.limit:
+                    break
+            if batch and not self.cancelled:
+                await self._bulk(batch)
+        except discord.Forbidden:
+            self.error = "forbidden"
+        except discord.HTTPException as e:
+            self.error = f"{e.status}"
+            logger.warning("Purge in channel %s stopped: %s", self.channel.id, e)
+        finally:
+            self.finished = True
+        await report(force=True)
+        return self
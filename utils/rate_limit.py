@@ -0,0 +1,30 @@
+"""Client-side pacing for Discord requests that have their own rate limits."""
+import asyncio
+import time
+
+
+class SendBucket:
+    """Token bucket: ``size`` requests per ``period`` seconds, refilled continuously."""
+
+    def __init__(self, size: int, period: float) -> None:
+        self.size = size
+        self.rate = size / period
+        self.tokens = float(size)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.size, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.size
+
+    async def acquire(self) -> None:
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
@@ -0,0 +1,193 @@
+"""In-memory dashboard assets with fingerprints, strong ETags and precompressed bodies.
+
+Everything under ``dashboard/static`` is read once at startup:
+
+- CSS/JS and other assets get a content hash in their URL
+  (``app.css`` -> ``app.3f2a9c1b0d.css``) and are served ``immutable`` for a year.
+- HTML pages have their ``/static/...`` references rewritten to those
+  fingerprinted URLs and are served ``no-cache``, so browsers revalidate and get a 304.
+- Text bodies are gzip-compressed (and brotli-compressed when the ``brotli``
+  package is installed). ``name.gz``/``name.br`` files next to an asset are
+  used as-is instead, so brotli output can be shipped without the package.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE: str = "public, max-age=31536000, immutable"
+REVALIDATE: str = "no-cache"
+MIN_COMPRESS_SIZE: int = 512
+COMPRESSIBLE_TYPES: tuple[str, ...] = ("text/", "application/javascript", "application/json", "image/svg+xml")
+PRECOMPRESSED: tuple[str, ...] = (".gz", ".br")
+STATIC_REF_RE = re.compile(r"""(["'(])/static/([^"')?#]+)""")
+
+
+def _fingerprint(name: str, digest: str) -> str:
+    base, ext = os.path.splitext(name)
+    return f"{base}.{digest}{ext}"
+
+
+def _content_type(name: str) -> str:
+    if name.endswith(".js"):
+        # mimetypes on some hosts still says text/javascript or nothing at all
+        return "application/javascript"
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def parse_accept_encoding(header: str) -> set[str]:
+    """Encodings the client accepts with a non-zero quality value."""
+    accepted: set[str] = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+class Asset:
+    __slots__ = ("name", "url", "content_type", "cache_control", "digest", "bodies")
+
+    def __init__(self, name: str, body: bytes, content_type: str, cache_control: str) -> None:
+        self.name = name
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.url = f"/static/{name}"
+        self.bodies: dict[str, bytes] = {"identity": body}
+
+    def alias(self, name: str, cache_control: str) -> "Asset":
+        """Same bodies and validators under another name and caching policy."""
+        other = Asset.__new__(Asset)
+        other.name = name
+        other.content_type = self.content_type
+        other.cache_control = cache_control
+        other.digest = self.digest
+        other.url = f"/static/{name}"
+        other.bodies = self.bodies
+        return other
+
+    def etag(self, encoding: str = "identity") -> str:
+        # Strong validators must differ per representation
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """Best stored encoding for an ``Accept-Encoding`` header: br, then gzip, then identity."""
+        if len(self.bodies) == 1:
+            return "identity"
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def compress(self, directory: Optional[str] = None) -> None:
+        """Fill in gzip/br bodies, preferring up-to-date ``.gz``/``.br`` files in ``directory``."""
+        if not self.content_type.startswith(COMPRESSIBLE_TYPES):
+            return
+        body = self.bodies["identity"]
+        for suffix, encoding in ((".gz", "gzip"), (".br", "br")):
+            if directory is None:
+                break
+            path = os.path.join(directory, self.name + suffix)
+            if os.path.isfile(path) and os.path.getmtime(path) >= os.path.getmtime(os.path.join(directory, self.name)):
+                with open(path, "rb") as f:
+                    self.bodies[encoding] = f.read()
+        if len(body) < MIN_COMPRESS_SIZE:
+            return
+        if "gzip" not in self.bodies:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if "br" not in self.bodies and brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        # Keep only encodings that actually save bytes
+        for encoding in [e for e in self.bodies if e != "identity"]:
+            if len(self.bodies[encoding]) >= len(body):
+                del self.bodies[encoding]
+
+
+class StaticAssets:
+    """Loads a static directory into memory. ``pages`` are the HTML files, keyed by name."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.assets: dict[str, Asset] = {}
+        self.pages: dict[str, Asset] = {}
+        self.urls: dict[str, str] = {}
+
+    def load(self) -> "StaticAssets":
+        self.assets.clear()
+        self.pages.clear()
+        self.urls.clear()
+        plain: dict[str, Asset] = {}
+        if not os.path.isdir(self.root):
+            return self
+
+        html: list[str] = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                if filename.endswith(PRECOMPRESSED):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, "/")
+                if name.endswith(".html"):
+                    html.append(name)
+                    continue
+                with open(os.path.join(dirpath, filename), "rb") as f:
+                    body = f.read()
+                asset = Asset(name, body, _content_type(name), IMMUTABLE)
+                asset.compress(self.root)
+                fingerprinted = _fingerprint(name, asset.digest[:10])
+                asset.url = f"/static/{fingerprinted}"
+                self.assets[fingerprinted] = asset
+                self.urls[name] = asset.url
+                # Unversioned URL keeps working for old pages and bookmarks, with revalidation
+                plain[name] = asset.alias(name, REVALIDATE)
+
+        for name in html:
+            with open(os.path.join(self.root, name), "rb") as f:
+                text = f.read().decode("utf-8")
+            body = STATIC_REF_RE.sub(self._rewrite, text).encode("utf-8")
+            page = Asset(name, body, "text/html; charset=utf-8", REVALIDATE)
+            # Rewritten pages no longer match any precompressed file on disk
+            page.compress()
+            self.pages[name] = page
+        # Fingerprinted names win if a plain name happens to look like one
+        self.assets = {**plain, **self.assets}
+        return self
+
+    def _rewrite(self, match: "re.Match[str]") -> str:
+        url = self.urls.get(match.group(2))
+        if url is None:
+            return match.group(0)
+        return match.group(1) + url
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self.assets.get(name) or self.pages.get(name)
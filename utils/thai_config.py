@@ -0,0 +1,171 @@
+"""Layered on/off settings for Thai autocorrect: guild -> channel -> user.
+
+Stored in ``data/guild_thai_layout_config.json``:
+
+    {"version": 2,
+     "guilds": {"123": false, "dm": true},
+     "channels": {"456": true},
+     "users": {"789": false}}
+
+A user opt-out wins over everything, then a channel override, then the guild
+setting (default on). The old flat ``{"<guild id>": bool}`` file is migrated on
+load. Lookups read precomputed sets keyed by int ids; changes mark the store
+dirty and a background task writes them in one batch, and also picks up edits
+made to the file by hand.
+"""
+import asyncio
+import json
+import os
+from typing import Any, Optional
+
+from utils.metrics import STORAGE_FLUSH_DURATION
+
+THAI_LAYOUT_CONFIG_FILE: str = "data/guild_thai_layout_config.json"
+CONFIG_VERSION: int = 2
+FLUSH_INTERVAL: float = 2.0
+DM_KEY: str = "dm"
+LAYERS: tuple[str, ...] = ("guilds", "channels", "users")
+
+
+def _key_id(key: str) -> Optional[int]:
+    # Guild id 0 stands for DMs in the lookup structures
+    if key == DM_KEY:
+        return 0
+    return int(key) if key.isdigit() else None
+
+
+def migrate(data: dict[str, Any]) -> dict[str, Any]:
+    """Bring a loaded file up to the current layout (the legacy file was a flat guild -> bool map)."""
+    if data.get("version") == CONFIG_VERSION:
+        return {"version": CONFIG_VERSION, **{layer: dict(data.get(layer, {})) for layer in LAYERS}}
+    guilds = {key: bool(value) for key, value in data.items() if isinstance(value, bool)}
+    return {"version": CONFIG_VERSION, "guilds": guilds, "channels": {}, "users": {}}
+
+
+class ThaiLayoutConfig:
+    def __init__(self, path: str = THAI_LAYOUT_CONFIG_FILE, interval: float = FLUSH_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.data: dict[str, Any] = migrate({})
+        self._disabled_guilds: frozenset[int] = frozenset()
+        self._channels: dict[int, bool] = {}
+        self._opted_out: frozenset[int] = frozenset()
+        self._mtime: Optional[float] = None
+        self._dirty: bool = False
+        self._task: Optional[asyncio.Task] = None
+
+    # --- lookup ---
+
+    def enabled_for(self, guild_id: int, channel_id: int, user_id: int) -> bool:
+        """Resolve the layers for one message; ``guild_id`` is 0 in DMs."""
+        if user_id in self._opted_out:
+            return False
+        override = self._channels.get(channel_id)
+        if override is not None:
+            return override
+        return guild_id not in self._disabled_guilds
+
+    def _rebuild(self) -> None:
+        guilds, channels, users = (self.data[layer] for layer in LAYERS)
+        self._disabled_guilds = frozenset(
+            gid for key, enabled in guilds.items() if not enabled and (gid := _key_id(key)) is not None
+        )
+        self._channels = {cid: bool(enabled) for key, enabled in channels.items() if (cid := _key_id(key))}
+        self._opted_out = frozenset(
+            uid for key, enabled in users.items() if not enabled and (uid := _key_id(key))
+        )
+
+    # --- changes ---
+
+    def set(self, layer: str, key: Any, enabled: Optional[bool]) -> None:
+        """Set a guild/channel/user switch; ``None`` removes the override. Written on the next flush."""
+        entries = self.data[layer]
+        key = str(key)
+        if enabled is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = enabled
+        self._rebuild()
+        self._dirty = True
+
+    def set_guild(self, guild_id: Optional[int], enabled: bool) -> None:
+        self.set("guilds", guild_id if guild_id else DM_KEY, enabled)
+
+    def set_channel(self, channel_id: int, enabled: Optional[bool]) -> None:
+        self.set("channels", channel_id, enabled)
+
+    def set_user(self, user_id: int, enabled: Optional[bool]) -> None:
+        # Only opt-outs are stored; opting back in just drops the entry
+        self.set("users", user_id, None if enabled else False)
+
+    # --- persistence ---
+
+    def load(self) -> "ThaiLayoutConfig":
+        try:
+            self._mtime = os.stat(self.path).st_mtime
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if not isinstance(raw, dict):
+                raw = {}
+            self.data = migrate(raw)
+            if raw.get("version") != CONFIG_VERSION:
+                # Rewrite legacy files in the new layout on the next flush
+                self._dirty = True
+        except (OSError, ValueError):
+            self.data = migrate({})
+        self._rebuild()
+        return self
+
+    def _write(self, payload: str) -> float:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with STORAGE_FLUSH_DURATION.time(store="thai_layout_config"):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+        return os.stat(self.path).st_mtime
+
+    def flush_sync(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._mtime = self._write(json.dumps(self.data, ensure_ascii=False, indent=2))
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Serialize on the loop so the snapshot is consistent; only the disk write leaves it
+        payload = json.dumps(self.data, ensure_ascii=False, indent=2)
+        try:
+            self._mtime = await asyncio.to_thread(self._write, payload)
+        except OSError:
+            self._dirty = True
+
+    def check(self) -> bool:
+        """Reload if the file was changed by someone else since the last read or write."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime or self._dirty:
+            return False
+        self.load()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._dirty:
+                await self.flush()
+            else:
+                self.check()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush_sync()
@@ -0,0 +1,102 @@
+"""QWERTY -> Thai (Kedmanee) keyboard layout conversion and mistype detection.
+
+Conversion goes through precompiled ``str.maketrans`` tables covering the
+unshifted and shifted layers, so a whole message is one ``translate`` call.
+``is_likely_mistyped_thai`` runs on every non-command message, so it is
+built from C-level string operations (``isascii``, ``translate``, one
+compiled regex search) instead of per-character Python loops.
+"""
+import re
+
+from utils.ngram_model import load_model
+
+QWERTY_KEYS: str = "`1234567890-=qwertyuiop[]\\asdfghjkl;'zxcvbnm,./"
+QWERTY_SHIFT_KEYS: str = '~!@#$%^&*()_+QWERTYUIOP{}|ASDFGHJKL:"ZXCVBNM<>?'
+KEDMANEE: str = "_ๅ/-ภถุึคตจขชๆไำพะัีรนยบลฃฟหกดเ้่าสวงผปแอิืทมใฝ"
+KEDMANEE_SHIFT: str = '%+๑๒๓๔ู฿๕๖๗๘๙๐"ฎฑธํ๊ณฯญฐ,ฅฤฆฏโฌ็๋ษศซ.()ฉฮฺ์?ฒฬฦ'
+
+KEDMANEE_UNSHIFTED: dict[str, str] = dict(zip(QWERTY_KEYS, KEDMANEE))
+KEDMANEE_SHIFTED: dict[str, str] = dict(zip(QWERTY_SHIFT_KEYS, KEDMANEE_SHIFT))
+QWERTY_TO_THAI_MAP: dict[str, str] = {**KEDMANEE_UNSHIFTED, **KEDMANEE_SHIFTED}
+
+QWERTY_TO_THAI: dict[int, str] = str.maketrans(QWERTY_TO_THAI_MAP)
+# Only Thai code points go back; the ASCII outputs of the shift layer (",", ".", "(", ...) stay as typed
+THAI_TO_QWERTY: dict[int, str] = str.maketrans({thai: key for key, thai in QWERTY_TO_THAI_MAP.items() if not thai.isascii()})
+
+# Keys the detector counts as "would have been Thai"; kept separate from the layout so its decisions stay stable
+DETECTION_KEYS: frozenset[str] = frozenset("abcdefghijklmnopqrstuvwxyz0123456789[];',./")
+
+THAI_RE = re.compile('[\u0E00-\u0E7F]')
+# Links, mentions and custom/shortcode emoji; rewriting these would break them
+MARKUP_RE = re.compile(r'://|<[@#:a]|:\w+:')
+SYMBOLS: str = "[]{};:'\",.<>/?`~!@#$%^&*()-_=+"
+ASCII_ALNUM: str = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# translate() tables that delete a character class; the length difference is its count
+_DELETE_MAPPABLE: dict[int, None] = dict.fromkeys(map(ord, DETECTION_KEYS))
+_DELETE_COUNTED: dict[int, None] = dict.fromkeys(map(ord, ASCII_ALNUM + SYMBOLS))
+
+
+def qwerty_to_thai_text(text: str) -> str:
+    """Convert text typed with the US layout active to what the Kedmanee layout would have produced."""
+    return text.translate(QWERTY_TO_THAI)
+
+
+def convert_to_thai(text: str) -> str:
+    """Alias for QWERTY->Thai conversion."""
+    return text.translate(QWERTY_TO_THAI)
+
+
+def thai_to_qwerty_text(text: str) -> str:
+    """Convert text typed with the Thai layout active back to the US keys that were pressed."""
+    return text.translate(THAI_TO_QWERTY)
+
+
+def is_likely_mistyped_thai(text: str) -> bool:
+    """Whether ``text`` looks like Thai typed with an English keyboard layout active.
+
+    The key-ratio heuristic screens out most messages; the survivors are
+    confirmed by the character n-gram model (``utils.ngram_model``) when its
+    file is present, which rejects English that merely uses mappable keys.
+    """
+    if not mappable_ratio_check(text):
+        return False
+    if MARKUP_RE.search(text):
+        return False
+    model = load_model()
+    if model is None:
+        return True
+    return model.is_mistyped(text, text.translate(QWERTY_TO_THAI))
+
+
+def mappable_ratio_check(text: str) -> bool:
+    """The original heuristic: at least 55% of the countable characters map to
+    Thai keys across two or more words, or 70% for a single run of four or
+    more characters.
+    """
+    if len(text) < 2:
+        return False
+    stripped = text.strip()
+    if len(stripped) < 2:
+        return False
+
+    if text.isascii():
+        rest = text.translate(_DELETE_COUNTED)
+        total = len(text) - len(rest)
+    else:
+        if THAI_RE.search(text):
+            return False
+        rest = text.translate(_DELETE_COUNTED)
+        # Only the leftovers need the Unicode-aware check (accented letters, other scripts)
+        total = len(text) - len(rest) + sum(1 for c in rest if c.isalnum())
+    if total == 0:
+        return False
+
+    ratio = (len(text) - len(text.translate(_DELETE_MAPPABLE))) / total
+
+    if ratio >= 0.55 and len(stripped.split(None, 1)) > 1:
+        return True
+    if ratio >= 0.70 and len(text) >= 4:
+        return True
+
+    return False
@@ -0,0 +1,198 @@
+"""Cache of synthesized TTS audio, kept as Opus packets ready for the voice socket.
+
+Entries are keyed by voice (engine and language) and normalized text. Each entry is stored once
+on disk as an Ogg Opus file (48 kHz stereo, 20 ms frames, what Discord
+sends) and held in memory as its list of Opus packets, so a hit plays with no
+FFmpeg process at all. Both tiers evict least recently used entries by size.
+Concurrent requests for the same phrase share one synthesis.
+
+Spoken name prefixes ("<name> says") live in their own, smaller cache so a
+burst of new phrases cannot push them out; the queue plays the prefix packets
+followed by the message packets instead of synthesizing them together.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from discord.oggparse import OggStream
+
+logger = logging.getLogger("entrophy.tts")
+
+CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "data/tts_cache")
+MEMORY_BYTES: int = int(os.getenv("TTS_CACHE_MEMORY_MB", "16")) * 1024 * 1024
+DISK_BYTES: int = int(os.getenv("TTS_CACHE_DISK_MB", "256")) * 1024 * 1024
+NAME_MEMORY_BYTES: int = 2 * 1024 * 1024
+NAME_DISK_BYTES: int = 16 * 1024 * 1024
+
+Packets = tuple[bytes, ...]
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def cache_key(voice: str, text: str) -> str:
+    return hashlib.sha1(f"{voice}\0{normalize_phrase(text)}".encode("utf-8")).hexdigest()
+
+
+def ogg_packets(data: bytes) -> Packets:
+    """Audio packets of an Ogg Opus file, without the OpusHead/OpusTags header packets."""
+    return tuple(
+        packet for packet in OggStream(io.BytesIO(data)).iter_packets()
+        if not packet.startswith((b"OpusHead", b"OpusTags"))
+    )
+
+
+def _size(packets: Packets) -> int:
+    return sum(map(len, packets))
+
+
+class AudioCache:
+    def __init__(self, directory: str = CACHE_DIR, memory_bytes: int = MEMORY_BYTES, disk_bytes: int = DISK_BYTES) -> None:
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, Packets] = OrderedDict()
+        self._memory_used = 0
+        # key -> file size, least recently used first
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_used = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".ogg")
+
+    def scan(self) -> "AudioCache":
+        """Index the files already on disk, oldest access first."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".ogg") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        self._disk.clear()
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+        self._disk_used = sum(self._disk.values())
+        self._remove(self._evict_disk())
+        return self
+
+    # --- memory tier ---
+
+    def _remember(self, key: str, packets: Packets) -> None:
+        size = _size(packets)
+        if size > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= _size(old)
+        self._memory[key] = packets
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= _size(evicted)
+
+    # --- disk tier (_read/_write/_remove block; they run through asyncio.to_thread) ---
+
+    def _read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # mtime doubles as the access time for ordering after a restart
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+
+    def _remove(self, paths: list[str]) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict_disk(self) -> list[str]:
+        # Index bookkeeping stays on the loop; only the unlinking goes to a thread
+        paths = []
+        while self._disk_used > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_used -= size
+            paths.append(self._path(key))
+        return paths
+
+    # --- lookups ---
+
+    async def get(self, key: str) -> Optional[Packets]:
+        packets = self._memory.get(key)
+        if packets is not None:
+            self._memory.move_to_end(key)
+            return packets
+        if key not in self._disk:
+            return None
+        data = await asyncio.to_thread(self._read, key)
+        if data is None:
+            self._disk_used -= self._disk.pop(key, 0)
+            return None
+        self._disk.move_to_end(key)
+        packets = ogg_packets(data)
+        self._remember(key, packets)
+        return packets
+
+    async def put(self, key: str, data: bytes) -> Packets:
+        """Store an Ogg Opus file and return its packets."""
+        packets = ogg_packets(data)
+        self._remember(key, packets)
+        try:
+            await asyncio.to_thread(self._write, key, data)
+        except OSError:
+            logger.warning("Could not write TTS cache entry %s", key, exc_info=True)
+            return packets
+        self._disk_used += len(data) - self._disk.pop(key, 0)
+        self._disk[key] = len(data)
+        evicted = self._evict_disk()
+        if evicted:
+            await asyncio.to_thread(self._remove, evicted)
+        return packets
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[bytes]]) -> Packets:
+        """Cached packets for ``key``, calling ``create`` (returning Ogg Opus) at most once at a time."""
+        packets = await self.get(key)
+        if packets is not None:
+            self.hits += 1
+            return packets
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            packets = await self.put(key, await create())
+            future.set_result(packets)
+            return packets
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not reported as "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,157 @@
+"""Speech synthesis backends.
+
+Each engine turns ``(text, lang)`` into audio bytes FFmpeg can read. Engines
+block, so callers run them through ``utils.tts_synth.run_synth``. Pick
+engines with ``TTS_ENGINE``, a comma-separated preference order such as
+``piper,espeak,gtts``; each language uses the first listed engine that is
+installed and has a voice for it.
+
+- ``gtts``: Google Translate TTS over HTTPS (the original backend, needs network)
+- ``espeak``: espeak-ng, fully offline, robotic but fast
+- ``piper``: Piper neural voices, offline; one ``<lang>.onnx`` model (plus its
+  ``.onnx.json``) per language in ``PIPER_MODEL_DIR``
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import wave
+from abc import ABC, abstractmethod
+from typing import Optional
+
+logger = logging.getLogger("entrophy.tts")
+
+ENGINE_ORDER: tuple[str, ...] = tuple(
+    name.strip() for name in os.getenv("TTS_ENGINE", "gtts").split(",") if name.strip()
+)
+ENGINE_TIMEOUT: float = float(os.getenv("TTS_SYNTH_TIMEOUT", "8"))
+PIPER_MODEL_DIR: str = os.getenv("PIPER_MODEL_DIR", "models/piper")
+
+# Languages offered by /ttshere
+LANGUAGES: tuple[str, ...] = ("th", "en", "ko", "ja")
+
+
+class TTSEngine(ABC):
+    name: str = ""
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, lang: str) -> bool:
+        return lang in LANGUAGES
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str) -> bytes:
+        ...
+
+
+class GTTSEngine(TTSEngine):
+    name = "gtts"
+
+    def available(self) -> bool:
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, timeout=ENGINE_TIMEOUT).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakEngine(TTSEngine):
+    name = "espeak"
+    voices: dict[str, str] = {"th": "th", "en": "en-us", "ko": "ko", "ja": "ja"}
+
+    def __init__(self) -> None:
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def supports(self, lang: str) -> bool:
+        return lang in self.voices
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        # Text goes through stdin so it can never be read as an option
+        result = subprocess.run(
+            [self.binary, "-v", self.voices[lang], "--stdin", "--stdout"],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            timeout=ENGINE_TIMEOUT,
+            check=True,
+        )
+        return result.stdout
+
+
+class PiperEngine(TTSEngine):
+    name = "piper"
+
+    def __init__(self, model_dir: str = PIPER_MODEL_DIR) -> None:
+        self.binary = shutil.which("piper")
+        self.model_dir = model_dir
+        self._sample_rates: dict[str, int] = {}
+
+    def _model(self, lang: str) -> str:
+        return os.path.join(self.model_dir, f"{lang}.onnx")
+
+    def available(self) -> bool:
+        return self.binary is not None and os.path.isdir(self.model_dir)
+
+    def supports(self, lang: str) -> bool:
+        return os.path.exists(self._model(lang))
+
+    def _sample_rate(self, lang: str) -> int:
+        rate = self._sample_rates.get(lang)
+        if rate is None:
+            with open(self._model(lang) + ".json", "r", encoding="utf-8") as f:
+                rate = self._sample_rates[lang] = int(json.load(f)["audio"]["sample_rate"])
+        return rate
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        result = subprocess.run(
+            [self.binary, "--model", self._model(lang), "--output-raw"],
+            input=text.encode("utf-8"),
+            capture_output=True,
+            timeout=ENGINE_TIMEOUT,
+            check=True,
+        )
+        # Raw output is mono 16-bit PCM at the model's rate; wrap it so FFmpeg knows the format
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self._sample_rate(lang))
+            wav.writeframes(result.stdout)
+        return buffer.getvalue()
+
+
+ENGINES: dict[str, type[TTSEngine]] = {
+    GTTSEngine.name: GTTSEngine,
+    EspeakEngine.name: EspeakEngine,
+    PiperEngine.name: PiperEngine,
+}
+
+
+class EngineSelector:
+    """Resolves the engine for each language from a preference order, once per language."""
+
+    def __init__(self, order: tuple[str, ...] = ENGINE_ORDER) -> None:
+        unknown = [name for name in order if name not in ENGINES]
+        if unknown:
+            # A typo in TTS_ENGINE should not keep the voice cog from loading
+            logger.warning("Ignoring unknown TTS engine(s) in TTS_ENGINE: %s", ", ".join(unknown))
+        known = [name for name in order if name in ENGINES] or [GTTSEngine.name]
+        self.engines: list[TTSEngine] = [engine for engine in (ENGINES[name]() for name in known) if engine.available()]
+        self._by_lang: dict[str, Optional[TTSEngine]] = {}
+
+    def for_lang(self, lang: str) -> Optional[TTSEngine]:
+        if lang not in self._by_lang:
+            self._by_lang[lang] = next((engine for engine in self.engines if engine.supports(lang)), None)
+        return self._by_lang[lang]
@@ -0,0 +1,259 @@
+"""Per-guild text-to-speech playback queue.
+
+Messages are queued and played back to back: the voice client's ``after``
+callback wakes the consumer task, which starts the next item, so nothing is
+cut off by a newer message. Every user has their own FIFO and the consumer
+takes one item from each user in turn, so one chatty member cannot starve the
+rest of the channel. The queue is capped in total and per user, and skipping
+just stops the current source.
+
+Synthesis is pipelined: while item N plays, up to ``prefetch`` of the
+following items are already being synthesized, so the gap between messages
+is not a round trip to the TTS service. Each item is split into sentence
+chunks that are synthesized separately (at most ``SYNTH_CONCURRENCY`` at a
+time per guild) and played as they land, so a long message starts speaking
+after its first sentence. Audio is fed into the guild's long-lived
+``GuildAudioStream`` rather than starting a new player per message; the
+player is paused while the channel is quiet and resumed for the next item.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Iterator, Optional
+
+import discord
+
+from utils.tts_text import split_chunks
+from utils.voice_stream import SILENCE, GuildAudioStream
+
+logger = logging.getLogger("entrophy.tts")
+
+MAX_QUEUE: int = 25
+MAX_PER_USER: int = 5
+PREFETCH: int = 2
+SYNTH_CONCURRENCY: int = 2
+
+
+class TTSItem:
+    __slots__ = ("user_id", "text", "lang", "prefix", "chunks")
+
+    def __init__(self, user_id: int, text: str, lang: str, prefix: Optional[str] = None) -> None:
+        self.user_id = user_id
+        self.text = text
+        self.lang = lang
+        # Spoken before the text ("<name> says"); synthesized and cached separately
+        self.prefix = prefix
+        self.chunks = tuple(split_chunks(text))
+
+
+# Renders one piece of an item, (item, text, is_prefix), as 20 ms Opus packets
+Synthesizer = Callable[[TTSItem, str, bool], Awaitable[tuple[bytes, ...]]]
+
+_PENDING = None
+
+
+class Utterance:
+    """An item being synthesized piece by piece; the voice thread plays each piece as it lands."""
+
+    def __init__(self, item: TTSItem, synthesize: Synthesizer, limit: asyncio.Semaphore) -> None:
+        self.item = item
+        self.synthesize = synthesize
+        self.limit = limit
+        pieces = [(item.prefix, True)] if item.prefix else []
+        pieces.extend((chunk, False) for chunk in item.chunks)
+        # Filled in on the loop, read from the voice thread; a list slot store is atomic
+        self.slots: list[Optional[tuple[bytes, ...]]] = [_PENDING] * len(pieces)
+        self.cancelled = False
+        # Created in order, so the semaphore hands out slots sentence by sentence
+        self._tasks = [asyncio.create_task(self._render(i, text, is_prefix)) for i, (text, is_prefix) in enumerate(pieces)]
+
+    async def _render(self, index: int, text: str, is_prefix: bool) -> None:
+        packets: tuple[bytes, ...] = ()
+        try:
+            async with self.limit:
+                packets = await self.synthesize(self.item, text, is_prefix)
+        except asyncio.TimeoutError:
+            logger.warning("TTS synthesis timed out: %r", text[:50])
+        except Exception:
+            logger.exception("TTS synthesis failed: %r", text[:50])
+        finally:
+            self.slots[index] = packets or ()
+
+    async def wait_first(self) -> None:
+        """Wait until the first piece is ready (or failed)."""
+        if self._tasks:
+            await asyncio.wait(self._tasks[:1])
+
+    def packets(self) -> Iterator[bytes]:
+        # Runs on the voice thread: silence fills the wait for a piece still being synthesized
+        for index in range(len(self.slots)):
+            while self.slots[index] is _PENDING:
+                if self.cancelled:
+                    return
+                yield SILENCE
+            yield from self.slots[index]
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        for task in self._tasks:
+            task.cancel()
+
+
+class GuildTTSQueue:
+    def __init__(
+        self,
+        guild: discord.Guild,
+        synthesize: Synthesizer,
+        max_items: int = MAX_QUEUE,
+        max_per_user: int = MAX_PER_USER,
+        prefetch: int = PREFETCH,
+        on_play: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.guild = guild
+        self.synthesize = synthesize
+        self.on_play = on_play
+        self.max_items = max_items
+        self.max_per_user = max_per_user
+        self.prefetch = max(1, prefetch)
+        # Items taken from the fair queue whose synthesis is already running, in play order
+        self._pipeline: deque[Utterance] = deque()
+        self._synth_limit = asyncio.Semaphore(SYNTH_CONCURRENCY)
+        # Insertion order is the round-robin order; a user moves to the back after each turn
+        self._users: OrderedDict[int, deque[TTSItem]] = OrderedDict()
+        self._size = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stream: Optional[GuildAudioStream] = None
+        self.current: Optional[TTSItem] = None
+
+    def __len__(self) -> int:
+        return self._size + len(self._pipeline)
+
+    def put(self, item: TTSItem) -> bool:
+        """Queue ``item``; False when the queue or the user's share of it is full."""
+        items = self._users.get(item.user_id)
+        if len(self) >= self.max_items or (items is not None and len(items) >= self.max_per_user):
+            return False
+        if items is None:
+            items = self._users[item.user_id] = deque()
+        items.append(item)
+        self._size += 1
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return True
+
+    def _next(self) -> Optional[TTSItem]:
+        if not self._users:
+            return None
+        user_id, items = next(iter(self._users.items()))
+        item = items.popleft()
+        self._size -= 1
+        if items:
+            self._users.move_to_end(user_id)
+        else:
+            del self._users[user_id]
+        return item
+
+    def _fill_pipeline(self) -> None:
+        while len(self._pipeline) < self.prefetch:
+            item = self._next()
+            if item is None:
+                return
+            self._pipeline.append(Utterance(item, self.synthesize, self._synth_limit))
+
+    def clear(self) -> int:
+        dropped = len(self)
+        self._users.clear()
+        self._size = 0
+        for utterance in self._pipeline:
+            utterance.cancel()
+        self._pipeline.clear()
+        return dropped
+
+    def skip(self) -> bool:
+        """Stop the current item; the consumer moves on to the next one."""
+        return self._stream is not None and self._stream.skip()
+
+    def _pause_if_idle(self, stream: GuildAudioStream) -> None:
+        # Runs on the loop after the stream lingered; a feed may have arrived in between
+        vc = self.guild.voice_client
+        if vc is not None and vc.source is stream and not stream.busy and vc.is_playing():
+            vc.pause()
+
+    def _open_stream(self, vc: discord.VoiceClient) -> GuildAudioStream:
+        stream = self._stream
+        if stream is not None and not stream.closed and vc.source is stream:
+            if vc.is_paused():
+                vc.resume()
+            return stream
+        if vc.is_playing() or vc.is_paused():
+            # play() raises while another source is active
+            vc.stop()
+        loop = asyncio.get_running_loop()
+        stream = self._stream = GuildAudioStream(
+            on_idle=lambda: loop.call_soon_threadsafe(self._pause_if_idle, stream),
+        )
+
+        def after(error: Optional[Exception]) -> None:
+            # Runs on the voice thread once the player stops (stop() or disconnect)
+            if error is not None:
+                logger.warning("TTS playback error in guild %s: %s", self.guild.id, error)
+
+        vc.play(stream, after=after)
+        return stream
+
+    async def _play(self, vc: discord.VoiceClient, packets: Iterator[bytes]) -> None:
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+
+        def finished() -> None:
+            loop.call_soon_threadsafe(done.set)
+
+        if self.on_play is not None:
+            self.on_play()
+        # A stream whose player was just stopped refuses the feed; start a fresh one
+        if not self._open_stream(vc).feed(packets, finished):
+            self._open_stream(vc).feed(packets, finished)
+        await done.wait()
+
+    async def _run(self) -> None:
+        while True:
+            self._fill_pipeline()
+            if not self._pipeline:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            vc = self.guild.voice_client
+            if vc is None or not vc.is_connected():
+                # Nothing to play into; drop what was queued for the old connection
+                self.clear()
+                continue
+
+            utterance = self._pipeline.popleft()
+            self.current = utterance.item
+            try:
+                await utterance.wait_first()
+                # Start synthesizing the next items before this one plays
+                self._fill_pipeline()
+                if utterance.slots:
+                    await self._play(vc, utterance.packets())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("TTS item failed in guild %s", self.guild.id)
+            finally:
+                # Stops any pieces still synthesizing when the item was skipped
+                utterance.cancel()
+                self.current = None
+
+    def close(self) -> None:
+        self.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        vc = self.guild.voice_client
+        if self._stream is not None and vc is not None and vc.source is self._stream:
+            vc.stop()
+        self._stream = None
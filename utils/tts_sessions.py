@@ -0,0 +1,148 @@
+"""Which text channels are read aloud, and into which voice channel.
+
+Stored in ``data/tts_sessions.json``:
+
+    {"listeners": {"<text channel id>": {"guild_id": 1, "language": "th", "include_name": false, "user_id": 2}},
+     "voice": {"<guild id>": <voice channel id>}}
+
+A guild can have any number of listened channels, each with its own
+language. ``listeners`` is keyed by channel so the message path resolves a
+message with one dict get; ``voice`` remembers where the bot was connected so
+sessions can be restored after a restart. Changes mark the registry dirty and
+a background task writes them off the loop in one batch, like the Thai layout
+config.
+"""
+import asyncio
+import json
+import os
+from typing import Any, Optional
+
+from utils.metrics import STORAGE_FLUSH_DURATION
+
+TTS_SESSIONS_FILE: str = "data/tts_sessions.json"
+FLUSH_INTERVAL: float = 2.0
+
+
+class TTSListener:
+    __slots__ = ("guild_id", "channel_id", "language", "include_name", "user_id")
+
+    def __init__(self, guild_id: int, channel_id: int, language: str, include_name: bool, user_id: int) -> None:
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.language = language
+        self.include_name = include_name
+        self.user_id = user_id
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"guild_id": self.guild_id, "language": self.language, "include_name": self.include_name, "user_id": self.user_id}
+
+
+class TTSSessionRegistry:
+    def __init__(self, path: str = TTS_SESSIONS_FILE, interval: float = FLUSH_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.listeners: dict[int, TTSListener] = {}
+        self.voice: dict[int, int] = {}
+        self._dirty: bool = False
+        self._task: Optional[asyncio.Task] = None
+
+    def for_channel(self, channel_id: int) -> Optional[TTSListener]:
+        return self.listeners.get(channel_id)
+
+    def in_guild(self, guild_id: int) -> list[TTSListener]:
+        return [listener for listener in self.listeners.values() if listener.guild_id == guild_id]
+
+    def listen(self, guild_id: int, channel_id: int, voice_channel_id: int, language: str, include_name: bool, user_id: int) -> TTSListener:
+        listener = self.listeners[channel_id] = TTSListener(guild_id, channel_id, language, include_name, user_id)
+        self.voice[guild_id] = voice_channel_id
+        self._dirty = True
+        return listener
+
+    def set_voice(self, guild_id: int, voice_channel_id: int) -> None:
+        """Follow the bot when it is moved; only guilds with a session are tracked."""
+        if self.voice.get(guild_id, voice_channel_id) != voice_channel_id:
+            self.voice[guild_id] = voice_channel_id
+            self._dirty = True
+
+    def stop_channel(self, channel_id: int) -> Optional[TTSListener]:
+        listener = self.listeners.pop(channel_id, None)
+        if listener is not None:
+            if not self.in_guild(listener.guild_id):
+                self.voice.pop(listener.guild_id, None)
+            self._dirty = True
+        return listener
+
+    def end(self, guild_id: int) -> list[TTSListener]:
+        """Drop every listener in the guild; returns what was removed."""
+        removed = self.in_guild(guild_id)
+        for listener in removed:
+            del self.listeners[listener.channel_id]
+        had_voice = self.voice.pop(guild_id, None) is not None
+        if removed or had_voice:
+            self._dirty = True
+        return removed
+
+    # --- persistence ---
+
+    def load(self) -> "TTSSessionRegistry":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.listeners = {}
+        for key, entry in data.get("listeners", {}).items():
+            try:
+                self.listeners[int(key)] = TTSListener(
+                    int(entry["guild_id"]), int(key), str(entry.get("language", "en")),
+                    bool(entry.get("include_name", False)), int(entry.get("user_id", 0)),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.voice = {int(gid): int(cid) for gid, cid in data.get("voice", {}).items() if str(gid).isdigit()}
+        return self
+
+    def _payload(self) -> str:
+        return json.dumps({
+            "listeners": {str(cid): listener.to_dict() for cid, listener in self.listeners.items()},
+            "voice": {str(gid): cid for gid, cid in self.voice.items()},
+        }, indent=2)
+
+    def _write(self, payload: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with STORAGE_FLUSH_DURATION.time(store="tts_sessions"):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+
+    def flush_sync(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._write(self._payload())
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Serialize on the loop so the snapshot is consistent; only the disk write leaves it
+        payload = self._payload()
+        try:
+            await asyncio.to_thread(self._write, payload)
+        except OSError:
+            self._dirty = True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush_sync()
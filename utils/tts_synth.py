@@ -0,0 +1,51 @@
+"""Text-to-speech synthesis off the event loop.
+
+Engines (``utils.tts_engines``) block on an HTTPS request or a subprocess,
+and their output is then transcoded once to Ogg Opus for the cache, so both
+run on a small dedicated thread pool (shared by all guilds, sized so a busy
+voice channel cannot take the default executor's threads away from
+everything else) and every call has a deadline. A call that times out still
+finishes on its thread, but its result is dropped.
+"""
+import asyncio
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from utils.tts_engines import ENGINE_TIMEOUT, TTSEngine
+
+T = TypeVar("T")
+
+SYNTH_WORKERS: int = int(os.getenv("TTS_SYNTH_WORKERS", "4"))
+SYNTH_TIMEOUT: float = ENGINE_TIMEOUT
+
+# Discord's voice format: 48 kHz stereo Opus in 20 ms frames
+OPUS_ARGS: tuple[str, ...] = (
+    "-c:a", "libopus", "-b:a", "64k", "-ar", "48000", "-ac", "2",
+    "-frame_duration", "20", "-application", "voip", "-f", "ogg",
+)
+
+SYNTH_EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=SYNTH_WORKERS, thread_name_prefix="tts-synth")
+
+
+def encode_opus(audio: bytes) -> bytes:
+    """Blocking: transcode any FFmpeg-readable audio to an Ogg Opus file."""
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *OPUS_ARGS, "pipe:1"],
+        input=audio,
+        capture_output=True,
+        timeout=SYNTH_TIMEOUT,
+        check=True,
+    )
+    return result.stdout
+
+
+def synthesize_opus(engine: TTSEngine, text: str, lang: str) -> bytes:
+    return encode_opus(engine.synthesize(text, lang))
+
+
+async def run_synth(fn: Callable[..., T], *args, timeout: float = SYNTH_TIMEOUT) -> T:
+    """Run blocking ``fn(*args)`` on the synthesis pool; raises ``asyncio.TimeoutError`` after ``timeout``."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(SYNTH_EXECUTOR, fn, *args), timeout)
@@ -0,0 +1,112 @@
+"""Turn Discord message text into something worth speaking.
+
+``normalize`` works on ``Message.clean_content`` (mentions already resolved to
+names by discord.py) and drops what a TTS voice would only stumble over: code
+blocks, URLs, custom emoji and timestamp markup, markdown (quotes, headings,
+emphasis and spoiler pairs, code spans; lone symbols such as "C#" or "1 > 0"
+are left alone), and long runs of one character ("5555555", "!!!!!!").
+``detect_language`` picks a voice from the script when a session is set to
+``auto``, and ``split_chunks`` cuts long text at sentence boundaries so the
+first sentence can play while the rest is still being synthesized.
+"""
+import re
+
+MAX_CHARS: int = 1000
+CHUNK_CHARS: int = 180
+REPEAT_LIMIT: int = 3
+
+CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+URL_RE = re.compile(r"<?https?://\S+>?", re.IGNORECASE)
+CUSTOM_EMOJI_RE = re.compile(r"<a?:(\w+):\d+>")
+TIMESTAMP_RE = re.compile(r"<t:\d+(?::[tTdDfFR])?>")
+# Anything mention-shaped clean_content left behind (unknown users/roles)
+RAW_MENTION_RE = re.compile(r"<(?:@[!&]?|#)\d+>")
+QUOTE_RE = re.compile(r"^[ \t]*>(?:>>)?[ \t]+", re.MULTILINE)
+HEADING_RE = re.compile(r"^[ \t]*(?:#{1,3}|-#)[ \t]+", re.MULTILINE)
+CODE_SPAN_RE = re.compile(r"(`+)(.+?)\1")
+# Only pairs that open and close outside a word, so snake_case and 2*3*4 stay intact
+EMPHASIS_RE = re.compile(r"(?<!\w)(\*{1,3}|_{1,2}|~~|\|\|)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+# clean_content renders mentions as "@name" ("@\u200beveryone" for everyone/here)
+MENTION_AT_RE = re.compile(r"(?<!\w)@\u200b?(?=\w)")
+REPEAT_RE = re.compile(r"(.)\1{%d,}" % REPEAT_LIMIT)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?。！？…])\s+|\n+")
+
+THAI_RE = re.compile(r"[\u0E00-\u0E7F]")
+HANGUL_RE = re.compile(r"[\u1100-\u11FF\u3130-\u318F\uAC00-\uD7AF]")
+KANA_RE = re.compile(r"[\u3040-\u30FF\u31F0-\u31FF]")
+CJK_RE = re.compile(r"[\u4E00-\u9FFF]")
+
+
+def normalize(text: str) -> str:
+    text = CODE_BLOCK_RE.sub(" ", text)
+    text = URL_RE.sub(" ", text)
+    text = CUSTOM_EMOJI_RE.sub(r" \1 ", text)
+    text = TIMESTAMP_RE.sub(" ", text)
+    text = RAW_MENTION_RE.sub(" ", text)
+    text = CODE_SPAN_RE.sub(r"\2", text)
+    text = QUOTE_RE.sub("", text)
+    text = HEADING_RE.sub("", text)
+    for _ in range(3):
+        # Nested pairs (***bold italic***, **_both_**) unwrap one layer per pass
+        text, count = EMPHASIS_RE.subn(r"\2", text)
+        if not count:
+            break
+    text = MENTION_AT_RE.sub("", text)
+    text = REPEAT_RE.sub(lambda m: m.group(1) * REPEAT_LIMIT, text)
+    # Keep line breaks as sentence boundaries for split_chunks, collapse everything else
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:MAX_CHARS]
+
+
+def detect_language(text: str, default: str = "en") -> str:
+    """Voice language from the dominant non-Latin script; ``default`` for Latin-only text."""
+    counts = {
+        "th": len(THAI_RE.findall(text)),
+        "ko": len(HANGUL_RE.findall(text)),
+        # Kanji alone is scored as Japanese: it is the only CJK voice offered
+        "ja": len(KANA_RE.findall(text)) + len(CJK_RE.findall(text)),
+    }
+    lang, count = max(counts.items(), key=lambda kv: kv[1])
+    return lang if count else default
+
+
+def _hard_split(piece: str, limit: int) -> list[str]:
+    words, parts, current = piece.split(" "), [], ""
+    for word in words:
+        while len(word) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:limit])
+            word = word[limit:]
+        if current and len(current) + 1 + len(word) > limit:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_chunks(text: str, limit: int = CHUNK_CHARS) -> list[str]:
+    """Sentence-sized pieces of at most ``limit`` characters, short sentences packed together.
+
+    Thai has no sentence punctuation, so over-long pieces fall back to
+    splitting at spaces (which Thai uses between phrases) and then anywhere.
+    """
+    chunks: list[str] = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        for piece in _hard_split(sentence, limit) if len(sentence) > limit else (sentence,):
+            if current and len(current) + 1 + len(piece) > limit:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,104 @@
+"""A long-lived Opus source per voice connection.
+
+Starting playback per utterance costs a new player thread and a speaking
+state update, and before the Opus cache it also cost an FFmpeg fork/exec. The
+stream is handed to ``VoiceClient.play`` once and utterances are fed into it
+from the loop; the voice thread pulls 20 ms packets from whichever utterance
+is current, so consecutive messages play without a gap. Between utterances it
+sends Opus silence for ``linger`` frames and then calls ``on_idle``; the owner
+pauses the player there, which drops the speaking indicator and parks the
+player thread. The next utterance resumes the same player, so the stream
+lives as long as the voice connection.
+"""
+import os
+import threading
+from collections import deque
+from typing import Callable, Iterable, Iterator, Optional
+
+import discord
+
+# One 20 ms frame of Opus silence
+SILENCE: bytes = b"\xf8\xff\xfe"
+LINGER_FRAMES: int = int(float(os.getenv("TTS_STREAM_LINGER", "1.0")) * 50)
+
+Done = Callable[[], None]
+Idle = Callable[[], None]
+
+
+class GuildAudioStream(discord.AudioSource):
+    def __init__(self, linger_frames: int = LINGER_FRAMES, on_idle: Optional[Idle] = None) -> None:
+        self.linger_frames = linger_frames
+        # Called once from the voice thread per quiet spell; must only schedule work on the loop
+        self.on_idle = on_idle
+        # read() runs on the voice thread, feed()/skip() on the loop
+        self._lock = threading.Lock()
+        self._pending: deque[tuple[Iterator[bytes], Done]] = deque()
+        self._current: Optional[tuple[Iterator[bytes], Done]] = None
+        self._idle_frames = 0
+        self.closed = False
+        self.frames_sent = 0
+
+    def feed(self, packets: Iterable[bytes], done: Done) -> bool:
+        """Queue an utterance; ``done`` is called from the voice thread when it ends or is dropped.
+
+        False once the player has stopped with the stream (``cleanup``); start a new one then.
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            self._pending.append((iter(packets), done))
+            self._idle_frames = 0
+            return True
+
+    @property
+    def busy(self) -> bool:
+        return self._current is not None or bool(self._pending)
+
+    def skip(self) -> bool:
+        with self._lock:
+            current, self._current = self._current, None
+        if current is None:
+            return False
+        current[1]()
+        return True
+
+    def read(self) -> bytes:
+        finished = []
+        idle = False
+        try:
+            with self._lock:
+                while True:
+                    if self._current is None and self._pending:
+                        self._current = self._pending.popleft()
+                    if self._current is None:
+                        self._idle_frames += 1
+                        idle = self._idle_frames == max(self.linger_frames, 1)
+                        return SILENCE
+                    packet = next(self._current[0], None)
+                    if packet is None:
+                        finished.append(self._current[1])
+                        self._current = None
+                        continue
+                    self._idle_frames = 0
+                    self.frames_sent += 1
+                    return packet
+        finally:
+            # Callbacks run outside the lock; they only schedule work on the loop
+            for done in finished:
+                done()
+            if idle and self.on_idle is not None:
+                self.on_idle()
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self) -> None:
+        # The player stopped (vc.stop() or disconnect): release every waiter
+        with self._lock:
+            self.closed = True
+            dropped = [self._current] if self._current is not None else []
+            dropped.extend(self._pending)
+            self._current = None
+            self._pending.clear()
+        for _, done in dropped:
+            done()
@@ -0,0 +1,244 @@
+"""Keeps voice connections healthy and releases the idle ones.
+
+The supervisor tracks the voice channel the bot is meant to be in for each
+guild and polls every ``interval`` seconds:
+
+- a connection that stays down past ``grace`` seconds (discord.py's own
+  reconnect gets that long) has its stale client torn down and is reconnected
+  with exponential backoff, giving up after ``max_failures`` attempts;
+- a connection with no listeners (non-bot members) for ``empty_timeout``
+  seconds, or no audio for ``idle_timeout`` seconds, is disconnected.
+
+Guilds leave the table when they disconnect, so its size follows the voice
+connections that exist right now rather than every join since start.
+``on_release(guild_id, reason)`` lets the owner drop its per-guild state
+(queues, sessions) at the same time.
+
+Start it from an async context with ``supervisor.start()``.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import discord
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger("entrophy.voice")
+
+CHECK_INTERVAL: float = 5.0
+IDLE_TIMEOUT: float = float(os.getenv("VOICE_IDLE_TIMEOUT", "600"))
+EMPTY_TIMEOUT: float = float(os.getenv("VOICE_EMPTY_TIMEOUT", "60"))
+RECONNECT_GRACE: float = 10.0
+MAX_BACKOFF: float = 300.0
+MAX_FAILURES: int = 6
+
+ReleaseCallback = Callable[[int, str], Awaitable[None]]
+
+
+class VoiceHealth:
+    __slots__ = (
+        "guild_id", "channel_id", "joined_at", "last_audio", "last_listener",
+        "down_since", "next_attempt", "backoff", "failures", "reconnects", "last_error",
+    )
+
+    def __init__(self, guild_id: int, channel_id: int) -> None:
+        now = time.monotonic()
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.joined_at = now
+        self.last_audio = now
+        self.last_listener = now
+        self.down_since: Optional[float] = None
+        self.next_attempt = 0.0
+        self.backoff = 2.0
+        self.failures = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+
+class VoiceSupervisor:
+    def __init__(
+        self,
+        bot: Any,
+        on_release: Optional[ReleaseCallback] = None,
+        interval: float = CHECK_INTERVAL,
+        idle_timeout: float = IDLE_TIMEOUT,
+        empty_timeout: float = EMPTY_TIMEOUT,
+        grace: float = RECONNECT_GRACE,
+        max_failures: int = MAX_FAILURES,
+    ) -> None:
+        self.bot = bot
+        self.on_release = on_release
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.empty_timeout = empty_timeout
+        self.grace = grace
+        self.max_failures = max_failures
+        self.guilds: dict[int, VoiceHealth] = {}
+        self.reconnects_total = 0
+        self.released_total = 0
+        self._reconnecting: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # --- tracking ---
+
+    def track(self, guild_id: int, channel_id: int) -> None:
+        """Record where the bot should be; call after every successful connect or move."""
+        state = self.guilds.get(guild_id)
+        if state is None:
+            self.guilds[guild_id] = VoiceHealth(guild_id, channel_id)
+        else:
+            state.channel_id = channel_id
+            state.down_since = None
+
+    def untrack(self, guild_id: int) -> None:
+        """Forget a guild the bot is leaving on purpose."""
+        self.guilds.pop(guild_id, None)
+
+    def is_reconnecting(self, guild_id: int) -> bool:
+        """True while the supervisor itself is tearing down and re-opening the guild's connection."""
+        return guild_id in self._reconnecting
+
+    def note_audio(self, guild_id: int) -> None:
+        state = self.guilds.get(guild_id)
+        if state is not None:
+            state.last_audio = time.monotonic()
+
+    # --- polling ---
+
+    async def release(self, guild_id: int, reason: str) -> None:
+        self.guilds.pop(guild_id, None)
+        self.released_total += 1
+        guild = self.bot.get_guild(guild_id)
+        vc = guild.voice_client if guild else None
+        if vc is not None:
+            try:
+                await vc.disconnect(force=True)
+            except Exception:
+                logger.debug("Disconnect failed in guild %s", guild_id, exc_info=True)
+        logger.info("Released voice connection in guild %s: %s", guild_id, reason)
+        if self.on_release is not None:
+            try:
+                await self.on_release(guild_id, reason)
+            except Exception:
+                logger.exception("Voice release callback failed for guild %s", guild_id)
+
+    async def _reconnect(self, state: VoiceHealth, guild: discord.Guild, now: float) -> None:
+        channel = guild.get_channel(state.channel_id)
+        if not isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            await self.release(state.guild_id, "voice channel no longer exists")
+            return
+        self._reconnecting.add(state.guild_id)
+        try:
+            stale = guild.voice_client
+            if stale is not None:
+                # A client that lost its websocket still holds the UDP socket and player thread
+                try:
+                    await stale.disconnect(force=True)
+                except Exception:
+                    pass
+            await channel.connect(timeout=15.0, reconnect=True)
+        except Exception as e:
+            state.failures += 1
+            state.last_error = f"{type(e).__name__}: {e}"
+            if state.failures >= self.max_failures:
+                await self.release(state.guild_id, f"reconnect failed {state.failures} times ({state.last_error})")
+                return
+            # Full jitter so guilds that dropped together do not retry together
+            state.next_attempt = now + random.uniform(state.backoff / 2, state.backoff)
+            state.backoff = min(state.backoff * 2, MAX_BACKOFF)
+            logger.warning("Voice reconnect failed in guild %s (attempt %d): %s", state.guild_id, state.failures, state.last_error)
+            return
+        finally:
+            self._reconnecting.discard(state.guild_id)
+        state.reconnects += 1
+        self.reconnects_total += 1
+        state.failures = 0
+        state.backoff = 2.0
+        state.down_since = None
+        state.last_audio = state.last_listener = time.monotonic()
+        logger.info("Voice reconnected in guild %s", state.guild_id)
+
+    async def check_guild(self, state: VoiceHealth) -> None:
+        now = time.monotonic()
+        guild = self.bot.get_guild(state.guild_id)
+        if guild is None:
+            await self.release(state.guild_id, "guild unavailable")
+            return
+        vc = guild.voice_client
+
+        if vc is None or not vc.is_connected():
+            if state.down_since is None:
+                state.down_since = now
+            if now - state.down_since >= self.grace and now >= state.next_attempt:
+                await self._reconnect(state, guild, now)
+            return
+
+        state.down_since = None
+        if vc.channel is not None and vc.channel.id != state.channel_id:
+            state.channel_id = vc.channel.id
+        if vc.is_playing():
+            state.last_audio = now
+        if vc.channel is not None and any(not member.bot for member in vc.channel.members):
+            state.last_listener = now
+
+        if now - state.last_listener >= self.empty_timeout:
+            await self.release(state.guild_id, f"no listeners for {self.empty_timeout:.0f}s")
+        elif now - state.last_audio >= self.idle_timeout:
+            await self.release(state.guild_id, f"no audio for {self.idle_timeout:.0f}s")
+
+    async def check(self) -> None:
+        for state in list(self.guilds.values()):
+            try:
+                await self.check_guild(state)
+            except Exception:
+                logger.exception("Voice supervisor check failed for guild %s", state.guild_id)
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            REGISTRY.gauge("entrophy_voice_connections", "Supervised voice connections", lambda: len(self.guilds))
+            REGISTRY.gauge("entrophy_voice_reconnects_total", "Voice connections re-established by the supervisor", lambda: self.reconnects_total, kind="counter")
+            REGISTRY.gauge("entrophy_voice_released_total", "Voice connections closed for idleness or failure", lambda: self.released_total, kind="counter")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for name in ("entrophy_voice_connections", "entrophy_voice_reconnects_total", "entrophy_voice_released_total"):
+            REGISTRY.unregister(name)
+
+    # --- reporting ---
+
+    def health(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        report = {}
+        for guild_id, state in self.guilds.items():
+            guild = self.bot.get_guild(guild_id)
+            vc = guild.voice_client if guild else None
+            connected = vc is not None and vc.is_connected()
+            latency = getattr(vc, "latency", float("nan")) if connected else float("nan")
+            report[str(guild_id)] = {
+                "channel_id": state.channel_id,
+                "connected": connected,
+                "playing": connected and vc.is_playing(),
+                "latency_ms": round(latency * 1000, 2) if latency == latency and latency != float("inf") else None,
+                "listeners": sum(1 for m in vc.channel.members if not m.bot) if connected and vc.channel else 0,
+                "idle_seconds": round(now - state.last_audio, 1),
+                "tracked_for_seconds": round(now - state.joined_at, 1),
+                "down_for_seconds": round(now - state.down_since, 1) if state.down_since is not None else None,
+                "reconnects": state.reconnects,
+                "failed_attempts": state.failures,
+                "last_error": state.last_error,
+            }
+        return report